@@ -0,0 +1,114 @@
+"""Share Chromium processes between workers via isolated browser contexts."""
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from obfuscation import BrowserIdentity
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
+
+@dataclass
+class _PooledBrowser:
+    browser: "Browser"
+    leases: int = 0
+
+
+@dataclass
+class PageLease:
+    """A page in its own context, borrowed from a shared browser."""
+
+    browser: "Browser"
+    context: "BrowserContext"
+    page: "Page"
+    host: _PooledBrowser
+
+
+class BrowserPool:
+    """Host up to ``contexts_per_browser`` worker contexts per Chromium process.
+
+    Each lease gets a fresh :class:`BrowserContext` (cookies, storage and
+    fingerprint are isolated per worker). A browser is launched only when all
+    running ones are full and is closed once its last lease is released.
+    """
+
+    def __init__(
+        self,
+        playwright: "Playwright",
+        *,
+        contexts_per_browser: int = 1,
+        headless: bool = False,
+    ) -> None:
+        self.playwright = playwright
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.headless = headless
+        self._browsers: list[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def browser_count(self) -> int:
+        return len(self._browsers)
+
+    async def lease(
+        self,
+        identity: Optional[BrowserIdentity] = None,
+        *,
+        launch_args: Sequence[str] = (),
+    ) -> PageLease:
+        """Return a new page; ``launch_args`` only apply if a browser starts."""
+        async with self._lock:
+            host = self._find_host()
+            if host is None:
+                browser = await self.playwright.chromium.launch(
+                    headless=self.headless, args=list(launch_args)
+                )
+                host = _PooledBrowser(browser)
+                self._browsers.append(host)
+            host.leases += 1
+
+        try:
+            context_kwargs: dict[str, Any] = identity.to_context_kwargs() if identity else {}
+            context = await host.browser.new_context(**context_kwargs)
+            if identity:
+                await context.add_init_script(identity.init_script())
+            page = await context.new_page()
+        except Exception:
+            await self._drop_lease(host)
+            raise
+        return PageLease(browser=host.browser, context=context, page=page, host=host)
+
+    async def release(self, lease: PageLease) -> None:
+        with suppress(Exception):
+            await lease.context.close()
+        await self._drop_lease(lease.host)
+
+    async def close(self) -> None:
+        async with self._lock:
+            browsers, self._browsers = self._browsers, []
+        for host in browsers:
+            with suppress(Exception):
+                await host.browser.close()
+
+    def _find_host(self) -> Optional[_PooledBrowser]:
+        for host in list(self._browsers):
+            if not host.browser.is_connected():
+                # Crashed browsers are forgotten; their leases fail on their own.
+                self._browsers.remove(host)
+                continue
+            if host.leases < self.contexts_per_browser:
+                return host
+        return None
+
+    async def _drop_lease(self, host: _PooledBrowser) -> None:
+        async with self._lock:
+            host.leases -= 1
+            if host.leases > 0:
+                return
+            if host in self._browsers:
+                self._browsers.remove(host)
+        with suppress(Exception):
+            await host.browser.close()
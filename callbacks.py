@@ -0,0 +1,13 @@
+"""Call progress and heartbeat callbacks that may or may not be coroutines."""
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Optional
+
+
+async def notify(callback: Optional[Callable], *args, **kwargs) -> None:
+    if callback is None:
+        return
+    result = callback(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        await result
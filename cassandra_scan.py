@@ -0,0 +1,169 @@
+"""Parallel full-table reads for Cassandra, split by token range."""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MIN_TOKEN = -(2**63)
+MAX_TOKEN = 2**63 - 1
+PARTITION_KEY = "name, address"
+
+_DONE = object()
+
+
+def token_ranges(session, splits: int) -> list[tuple[int, int]]:
+    """Split the Murmur3 ring into at least ``splits`` ``(start, end]`` ranges.
+
+    Ranges follow the cluster's own token boundaries when the driver knows
+    them, so each query is answered by the replicas that own its range.
+    Otherwise the ring is cut into equal parts.
+    """
+    boundaries: list[int] = []
+    try:
+        ring = session.cluster.metadata.token_map.ring
+        boundaries = sorted({int(token.value) for token in ring})
+    except AttributeError:
+        pass
+    if boundaries:
+        points = [MIN_TOKEN, *[b for b in boundaries if MIN_TOKEN < b < MAX_TOKEN], MAX_TOKEN]
+    else:
+        points = [MIN_TOKEN, MAX_TOKEN]
+    spans = list(zip(points, points[1:]))
+    per_span = max(1, -(-splits // len(spans)))
+    ranges = []
+    for start, end in spans:
+        step = (end - start) // per_span
+        for i in range(per_span):
+            stop = end if i == per_span - 1 else start + step * (i + 1)
+            ranges.append((start + step * i, stop))
+    return ranges
+
+
+class TokenRangeScanner:
+    """Read a Cassandra table range by range with bounded concurrency.
+
+    Up to ``concurrency`` ranges are queried at once, each paged with
+    ``page_size`` rows per round-trip. A failed page is retried from the
+    driver's paging state, so rows already returned are not repeated. Pages
+    go through a queue of ``concurrency * 2`` entries, so a slow consumer
+    holds the readers back instead of buffering the table in memory.
+    """
+
+    def __init__(
+        self,
+        session,
+        *,
+        concurrency: int = 8,
+        splits: int = 256,
+        page_size: int = 5000,
+        retries: int = 2,
+    ) -> None:
+        self.session = session
+        self.concurrency = max(1, concurrency)
+        self.splits = max(1, splits)
+        self.page_size = page_size
+        self.retries = retries
+
+    @classmethod
+    def from_env(cls, session, *, page_size: Optional[int] = None) -> "TokenRangeScanner":
+        return cls(
+            session,
+            concurrency=int(os.environ.get("CASSANDRA_SCAN_CONCURRENCY", "8")),
+            splits=int(os.environ.get("CASSANDRA_SCAN_SPLITS", "256")),
+            page_size=page_size or int(os.environ.get("CASSANDRA_SCAN_PAGE_SIZE", "5000")),
+            retries=int(os.environ.get("CASSANDRA_SCAN_RETRIES", "2")),
+        )
+
+    def _statement(self, select: str, table: str):
+        from cassandra.query import SimpleStatement
+
+        return SimpleStatement(
+            f"SELECT {select} FROM {table} "
+            f"WHERE token({PARTITION_KEY}) > %s AND token({PARTITION_KEY}) <= %s",
+            fetch_size=self.page_size,
+        )
+
+    def _pages(self, statement, start: int, end: int) -> Iterator[list[Any]]:
+        paging_state = None
+        attempts = 0
+        while True:
+            try:
+                result = self.session.execute(statement, (start, end), paging_state=paging_state)
+            except Exception as exc:  # noqa: BLE001 - driver errors vary by cause
+                if attempts >= self.retries:
+                    raise
+                attempts += 1
+                logger.warning("Token range (%d, %d] failed, retrying: %s", start, end, exc)
+                continue
+            attempts = 0
+            yield list(result.current_rows)
+            paging_state = result.paging_state
+            if paging_state is None:
+                return
+
+    def pages(self, select: str, table: str = "businesses") -> Iterator[list[Any]]:
+        """Yield pages of ``SELECT select FROM table`` rows from every range."""
+        statement = self._statement(select, table)
+        ranges = token_ranges(self.session, self.splits)
+        results: queue.Queue = queue.Queue(self.concurrency * 2)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read(token_range: tuple[int, int]) -> None:
+            if stop.is_set():
+                return
+            try:
+                for page in self._pages(statement, *token_range):
+                    if page and not put(page):
+                        return
+            except Exception as exc:  # noqa: BLE001 - handed to the consumer
+                put(exc)
+
+        def run_all() -> None:
+            with ThreadPoolExecutor(self.concurrency, thread_name_prefix="cassandra-scan") as pool:
+                for token_range in ranges:
+                    pool.submit(read, token_range)
+            put(_DONE)
+
+        runner = threading.Thread(target=run_all, name="cassandra-scan", daemon=True)
+        runner.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            runner.join()
+
+    def rows(self, select: str, table: str = "businesses") -> Iterator[Any]:
+        for page in self.pages(select, table):
+            yield from page
+
+    def count(self, table: str = "businesses") -> int:
+        """Count rows with one ``COUNT(*)`` per range, summed locally."""
+        statement = self._statement("COUNT(*)", table)
+        ranges = token_ranges(self.session, self.splits)
+
+        def count_range(token_range: tuple[int, int]) -> int:
+            return sum(int(row[0]) for page in self._pages(statement, *token_range) for row in page)
+
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="cassandra-count") as pool:
+            return sum(pool.map(count_range, ranges))
@@ -0,0 +1,158 @@
+"""Remember which map areas each search term has already exhausted."""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+COVERAGE_MODES = ("off", "record", "skip", "downweight")
+
+
+def normalize_term(term: str) -> str:
+    return re.sub(r"\s+", " ", term.strip().lower())
+
+
+def covers(recorded: str, term: str) -> bool:
+    """Return True when a scrape of ``recorded`` also covers ``term``.
+
+    Both are normalised terms. A term covers itself and every narrower term
+    that contains all of its words, so "pizza" covers "pizza delivery" but
+    not the other way round.
+    """
+    return set(recorded.split()) <= set(term.split())
+
+
+@dataclass
+class CoverageDecision:
+    action: str
+    total: int
+    previous: int = 0
+
+    @property
+    def skip(self) -> bool:
+        return self.action == "skip"
+
+
+class CoverageIndex:
+    """Log every cell scrape and answer "was this area already exhausted?".
+
+    Rows are keyed by the normalised search term, so the same term scraped
+    from neighbouring towns shares coverage, and a broader term's scrapes
+    count for the narrower terms it :func:`covers`. Lookups use a bounding
+    box over an index on ``(term, latitude, longitude)``.
+    """
+
+    def __init__(self, path: str, *, max_age: float = 30 * 86400) -> None:
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA busy_timeout=30000;")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS coverage (
+                id INTEGER PRIMARY KEY,
+                term TEXT NOT NULL,
+                query TEXT,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                zoom INTEGER,
+                found INTEGER NOT NULL,
+                saved INTEGER NOT NULL,
+                scraped_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_coverage_term_position "
+            "ON coverage(term, latitude, longitude)"
+        )
+        self.conn.commit()
+        self._terms: set[str] = {row[0] for row in self.conn.execute("SELECT DISTINCT term FROM coverage")}
+
+    def record(
+        self,
+        term: str,
+        query: str,
+        lat: float,
+        lon: float,
+        zoom: int,
+        found: int,
+        saved: int,
+    ) -> None:
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO coverage (term, query, latitude, longitude, zoom, found, saved, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (normalize_term(term), query, lat, lon, zoom, found, saved, time.time()),
+            )
+            self.conn.commit()
+            self._terms.add(normalize_term(term))
+
+    def overlapping_terms(self, term: str) -> list[str]:
+        """Return the recorded terms whose scrapes cover ``term``."""
+        normalized = normalize_term(term)
+        with self._lock:
+            return sorted(recorded for recorded in self._terms if covers(recorded, normalized))
+
+    def nearby(self, term: str, lat: float, lon: float, radius: float) -> list[tuple[int, int]]:
+        """Return ``(found, saved)`` for recent scrapes within ``radius`` degrees
+        of every term that covers ``term``."""
+        terms = self.overlapping_terms(term)
+        if not terms:
+            return []
+        since = time.time() - self.max_age
+        placeholders = ", ".join("?" for _ in terms)
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT found, saved FROM coverage
+                WHERE term IN ({placeholders})
+                  AND latitude BETWEEN ? AND ?
+                  AND longitude BETWEEN ? AND ?
+                  AND scraped_at >= ?
+                """,
+                (*terms, lat - radius, lat + radius, lon - radius, lon + radius, since),
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def assess(
+        self,
+        term: str,
+        lat: float,
+        lon: float,
+        radius: float,
+        total: int,
+        *,
+        mode: str,
+    ) -> CoverageDecision:
+        """Decide whether a cell is worth scraping again.
+
+        A cell counts as exhausted when every recent scrape around it, of the
+        term or a broader one, saved nothing new. ``skip`` then drops the cell; ``downweight``
+        halves how many results are read from it.
+        """
+        if mode not in {"skip", "downweight"}:
+            return CoverageDecision("scrape", total)
+        previous = self.nearby(term, lat, lon, radius)
+        if not previous or any(saved for _, saved in previous):
+            return CoverageDecision("scrape", total, len(previous))
+        if mode == "skip":
+            return CoverageDecision("skip", 0, len(previous))
+        return CoverageDecision("downweight", max(1, total // 2), len(previous))
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+def open_coverage(path: str, mode: str, *, max_age: float) -> Optional[CoverageIndex]:
+    if mode == "off":
+        return None
+    return CoverageIndex(path, max_age=max_age)
@@ -0,0 +1,317 @@
+"""Append-only CSV storage with a key index and a small row-count sidecar."""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from dedupe_index import DedupeIndex, business_key, row_fingerprint
+
+CSV_COLUMNS = [
+    "name",
+    "address",
+    "website",
+    "phone",
+    "reviews_average",
+    "query",
+    "latitude",
+    "longitude",
+]
+
+# How far :meth:`CsvStore.tail` reads back per step.
+_TAIL_BLOCK = 64 * 1024
+
+
+class CsvStore:
+    """Business rows in one CSV file, or a series of size-bounded segments.
+
+    The active segment stays open in append mode and each batch is written
+    with a single ``write`` call. New rows are checked against a
+    :class:`DedupeIndex` mapped from the ``.keys`` snapshot next to the
+    ``.meta`` file, so only rows written after the snapshot are read back
+    on the first write. The row count lives in a ``.meta`` sidecar
+    and recent rows are read backwards from the end of the last segment.
+
+    With ``segment_bytes`` a new segment (``businesses.1.csv``, ...) is
+    started once the active one reaches that size; every segment has its
+    own header. Positions returned by :meth:`read_keys` are byte offsets
+    across all segments in order.
+    """
+
+    def __init__(self, path: os.PathLike | str, *, segment_bytes: int = 0, readonly: bool = False) -> None:
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self.readonly = readonly
+        self.meta_path = self.path.with_name(self.path.name + ".meta")
+        self.keys_path = self.path.with_name(self.path.name + ".keys")
+        self._lock = threading.Lock()
+        self._handle: Optional[io.TextIOWrapper] = None
+        self._keys: Optional[DedupeIndex] = None
+        self._rows: Optional[int] = None
+        self.users = 0
+        if not readonly and not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._write_header(self.path)
+
+    def __fspath__(self) -> str:
+        return str(self.path)
+
+    @staticmethod
+    def _write_header(path: Path) -> None:
+        with path.open("w", newline="") as f:
+            csv.writer(f).writerow(CSV_COLUMNS)
+
+    def segment_path(self, index: int) -> Path:
+        if index == 0:
+            return self.path
+        return self.path.with_name(f"{self.path.stem}.{index}{self.path.suffix}")
+
+    def segments(self) -> list[Path]:
+        found = [self.path] if self.path.exists() else []
+        pattern = re.compile(rf"^{re.escape(self.path.stem)}\.(\d+){re.escape(self.path.suffix)}$")
+        numbered = []
+        for candidate in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+            match = pattern.match(candidate.name)
+            if match:
+                numbered.append((int(match.group(1)), candidate))
+        return found + [p for _, p in sorted(numbered)]
+
+    def _iter_rows(self, since: int = 0) -> Iterator[tuple[list[str], int]]:
+        """Yield ``(values, end)`` for each complete row after position ``since``."""
+        base = 0
+        for segment in self.segments():
+            size = segment.stat().st_size
+            if since >= base + size:
+                base += size
+                continue
+            with segment.open("rb") as f:
+                header = f.readline()
+                offset = max(since - base, len(header))
+                f.seek(offset)
+                consumed = base + offset
+
+                def lines() -> Iterator[str]:
+                    nonlocal consumed
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            # A row still being written; read it next time.
+                            return
+                        consumed += len(raw)
+                        yield raw.decode()
+
+                for values in csv.reader(lines()):
+                    yield values, consumed
+            base += size
+
+    def rows(self, since: int = 0) -> Iterator[tuple[list[str], int]]:
+        """Yield ``(values, end)`` for every complete row after position ``since``."""
+        return self._iter_rows(since)
+
+    def size(self) -> int:
+        return sum(segment.stat().st_size for segment in self.segments())
+
+    def _complete_size(self) -> int:
+        """Return :meth:`size` less a trailing row that is still being written."""
+        segments = self.segments()
+        if not segments:
+            return 0
+        end = self.size()
+        with segments[-1].open("rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            while position > 0:
+                step = min(_TAIL_BLOCK, position)
+                f.seek(position - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    return end - (position - (position - step + newline + 1))
+                position -= step
+        return end - segments[-1].stat().st_size
+
+    def read_keys(self, since: int = 0) -> tuple[Iterator[tuple[str, str]], int]:
+        """Return normalised keys stored after ``since`` and the end position.
+
+        The keys are streamed; the end position is known before they are read.
+        """
+        if since > self.size():
+            # The files are shorter than the caller's position: they were replaced.
+            return iter(()), self.size()
+        end = max(self._complete_size(), since)
+
+        def keys() -> Iterator[tuple[str, str]]:
+            for values, position in self._iter_rows(since):
+                if position > end:
+                    return
+                if len(values) >= 2:
+                    yield business_key(values[0], values[1])
+
+        return keys(), end
+
+    def fingerprint(self) -> str:
+        """Digest of the first row (see :func:`dedupe_index.row_fingerprint`)."""
+        return row_fingerprint(next((values[:2] for values, _ in self._iter_rows(0)), None))
+
+    def _load_meta(self) -> dict[str, Any]:
+        try:
+            return json.loads(self.meta_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self, end: int) -> None:
+        tmp = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        tmp.write_text(json.dumps({"rows": self._rows, "end": end}))
+        os.replace(tmp, self.meta_path)
+
+    def count(self) -> int:
+        """Row count from the sidecar plus any rows written after it."""
+        with self._lock:
+            if self._rows is not None and self._handle is not None:
+                return self._rows
+            return self._count_rows()
+
+    def _count_rows(self) -> int:
+        meta = self._load_meta()
+        since, rows = int(meta.get("end", 0)), int(meta.get("rows", 0))
+        if since > self.size():
+            since, rows = 0, 0
+        for _values, _end in self._iter_rows(since):
+            rows += 1
+        return rows
+
+    def append(self, values_seq: list[tuple]) -> int:
+        """Write rows whose key is not stored yet; return how many were written."""
+        if self.readonly:
+            raise RuntimeError(f"{self.path} was opened read-only")
+        with self._lock:
+            if self._keys is None:
+                self._load_index()
+            assert self._keys is not None and self._rows is not None
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            claimed = []
+            for values in values_seq:
+                key = business_key(values[0], values[1])
+                if not self._keys.reserve(key):
+                    continue
+                writer.writerow(values)
+                claimed.append(key)
+            if not claimed:
+                return 0
+            try:
+                handle = self._active_handle()
+                handle.write(buffer.getvalue())
+                handle.flush()
+            except BaseException:
+                self._keys.release(claimed)
+                raise
+            self._keys.confirm(claimed)
+            self._rows += len(claimed)
+            self._save_meta(self.size())
+            return len(claimed)
+
+    def _load_index(self) -> None:
+        # The stored keys come from the memory-mapped ``.keys`` snapshot that
+        # BusinessStore's dedupe index also uses; only the rows written
+        # after it are read from the file.
+        keys = DedupeIndex()
+        keys.preload(self.read_keys, snapshot=str(self.keys_path), identity=self.fingerprint())
+        self._keys = keys
+        self._rows = self._count_rows()
+
+    def _active_handle(self) -> io.TextIOWrapper:
+        segments = self.segments() or [self.path]
+        active = segments[-1]
+        if self._handle is not None and (
+            not self.segment_bytes or active.stat().st_size < self.segment_bytes
+        ):
+            return self._handle
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self.segment_bytes and active.exists() and active.stat().st_size >= self.segment_bytes:
+            active = self.segment_path(len(segments))
+            self._write_header(active)
+        elif not active.exists():
+            self._write_header(active)
+        self._handle = active.open("a", newline="")
+        return self._handle
+
+    def tail(self, limit: int) -> list[dict[str, str]]:
+        """Return the last ``limit`` rows, newest last, reading from the end."""
+        rows: deque[dict[str, str]] = deque(maxlen=limit)
+        if limit <= 0:
+            return []
+        for segment in reversed(self.segments()):
+            found = self._segment_tail(segment, limit - len(rows))
+            rows.extendleft(reversed(found))
+            if len(rows) >= limit:
+                break
+        return list(rows)
+
+    @staticmethod
+    def _segment_tail(segment: Path, limit: int) -> list[dict[str, str]]:
+        with segment.open("rb") as f:
+            header = f.readline()
+            start = len(header)
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            data = b""
+            while position > start:
+                step = min(_TAIL_BLOCK, position - start)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+                if data.count(b"\n") > limit:
+                    break
+        lines = data.split(b"\n")
+        if position > start:
+            # The first piece may be the middle of a row.
+            lines = lines[1:]
+        text = [line.decode() + "\n" for line in lines if line]
+        records = [
+            dict(zip(CSV_COLUMNS, values))
+            for values in csv.reader(text)
+            if len(values) == len(CSV_COLUMNS)
+        ]
+        return records[-limit:]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            if self._keys is not None:
+                self._keys.close()
+                self._keys = None
+
+
+_csv_stores: dict[Path, CsvStore] = {}
+_csv_stores_lock = threading.Lock()
+
+
+def open_csv_store(path: os.PathLike | str) -> CsvStore:
+    """Return the process-wide writer for ``path`` so workers share one handle."""
+    resolved = Path(path).resolve()
+    with _csv_stores_lock:
+        store = _csv_stores.get(resolved)
+        if store is None:
+            segment_bytes = int(os.environ.get("CSV_SEGMENT_BYTES", "0"))
+            store = _csv_stores[resolved] = CsvStore(path, segment_bytes=segment_bytes)
+        store.users += 1
+        return store
+
+
+def release_csv_store(store: CsvStore) -> None:
+    with _csv_stores_lock:
+        store.users -= 1
+        if store.users > 0:
+            return
+        resolved = store.path.resolve()
+        if _csv_stores.get(resolved) is store:
+            del _csv_stores[resolved]
+    store.close()
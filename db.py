@@ -1,7 +1,24 @@
+import hashlib
 import os
-import csv
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 import sqlite3
+from typing import Any, Iterable, Iterator
+
+from cassandra_scan import TokenRangeScanner
+from csv_store import CsvStore, open_csv_store, release_csv_store
+from dedupe_index import row_fingerprint
+from parquet_store import ParquetStore, open_parquet_store, release_parquet_store, split_query
+from sqlite_writer import (
+    SQLITE_UPSERT_BUSINESS,
+    SqliteConnection,
+    release_sqlite_writer,
+    sqlite_writer,
+)
 
 # Postgres driver is optional; only needed if you actually use postgres.
 try:
@@ -12,6 +29,135 @@ except Exception:
 DEFAULT_DSN = "dbname=maps user=postgres host=localhost password=postgres"
 DEFAULT_SQLITE = "maps.db"
 DEFAULT_CSV = "businesses.csv"
+DEFAULT_PARQUET = "businesses_parquet"
+
+CASSANDRA_INSERT_BUSINESS = """
+    INSERT INTO businesses (
+        name, address, website, phone, reviews_average, query, latitude, longitude
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Prepared statements per Cassandra session, keyed by CQL text.
+_prepared_statements: "weakref.WeakKeyDictionary[Any, dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+class BatchWriteError(RuntimeError):
+    """Some rows of a batch could not be written.
+
+    ``failures`` pairs each failed row with its last error; ``written`` lists
+    the rows that were stored.
+    """
+
+    def __init__(self, failures: list[tuple[tuple, Exception]], written: list[tuple]) -> None:
+        self.failures = failures
+        self.written = written
+        total = len(failures) + len(written)
+        super().__init__(f"{len(failures)} of {total} rows failed; first error: {failures[0][1]}")
+
+
+class PostgresPool:
+    """Connections to one Postgres DSN shared by every store in the process.
+
+    At most ``POSTGRES_POOL_MAX`` (default 10) connections are open; callers
+    wait for a free one instead of failing. A connection idle for longer than
+    ``POSTGRES_POOL_CHECK_AFTER`` seconds (default 30) is checked with
+    ``SELECT 1`` before it is handed out, and broken ones are replaced.
+    """
+
+    def __init__(self, dsn: str) -> None:
+        from psycopg2.pool import ThreadedConnectionPool
+
+        self.dsn = dsn
+        self.minconn = int(os.environ.get("POSTGRES_POOL_MIN", "1"))
+        self.maxconn = max(self.minconn, int(os.environ.get("POSTGRES_POOL_MAX", "10")))
+        self.check_after = float(os.environ.get("POSTGRES_POOL_CHECK_AFTER", "30"))
+        self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, dsn)
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._last_used: dict[int, float] = {}
+        self.users = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection; commit on success and roll back on error."""
+        with self._slots:
+            conn = self._checkout()
+            broken = False
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+                raise
+            finally:
+                self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn, close=broken or bool(conn.closed))
+
+    def _checkout(self):
+        for _ in range(self.maxconn):
+            conn = self._pool.getconn()
+            if self._healthy(conn):
+                return conn
+            self._last_used.pop(id(conn), None)
+            self._pool.putconn(conn, close=True)
+        return self._pool.getconn()
+
+    def _healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - self._last_used.get(id(conn), 0.0) < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+
+_postgres_pools: dict[str, PostgresPool] = {}
+_postgres_pools_lock = threading.Lock()
+
+
+def postgres_pool(dsn: str) -> PostgresPool:
+    """Return the process-wide pool for ``dsn``, creating it on first use."""
+    with _postgres_pools_lock:
+        pool = _postgres_pools.get(dsn)
+        if pool is None:
+            pool = _postgres_pools[dsn] = PostgresPool(dsn)
+        pool.users += 1
+        return pool
+
+
+def _release_postgres_pool(pool: PostgresPool) -> None:
+    with _postgres_pools_lock:
+        pool.users -= 1
+        if pool.users > 0:
+            return
+        if _postgres_pools.get(pool.dsn) is pool:
+            del _postgres_pools[pool.dsn]
+    pool.closeall()
+
+
+@contextmanager
+def _postgres(conn) -> Iterator[Any]:
+    """Yield a psycopg2 connection from a pool or a plain connection."""
+    if isinstance(conn, PostgresPool):
+        with conn.connection() as pooled:
+            yield pooled
+        return
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
 
 
 def get_storage(cli_store: str | None = None) -> str:
@@ -20,18 +166,21 @@ def get_storage(cli_store: str | None = None) -> str:
     return (cli_store or os.environ.get("MAPS_STORAGE", "sqlite")).lower()
 
 
-def get_dsn(cli_dsn: str | None = None) -> str:
+def get_dsn(cli_dsn: str | None = None, *, storage: str | None = None) -> str:
     """
     Return a DSN/path appropriate for the chosen backend.
     - sqlite: file path (defaults to ./maps.db)
     - csv: output file path
+    - parquet: dataset directory
     - postgres: connection string
     """
-    store = get_storage(None)
+    store = get_storage(storage)
     if store == "sqlite":
         return os.environ.get("SQLITE_PATH", DEFAULT_SQLITE)
     if store == "csv":
         return os.environ.get("CSV_PATH", DEFAULT_CSV)
+    if store == "parquet":
+        return os.environ.get("PARQUET_PATH", DEFAULT_PARQUET)
     # postgres
     return cli_dsn or os.environ.get("POSTGRES_DSN", DEFAULT_DSN)
 
@@ -40,9 +189,11 @@ def init_db(dsn: str | None, *, storage: str | None = None):
     """
     Create the businesses table if needed and return a connection object or path.
     - cassandra: returns a Session
-    - sqlite: returns a sqlite3.Connection
-    - csv: returns a Path to the csv file
-    - postgres: returns a psycopg2 connection
+    - sqlite: returns a sqlite3.Connection for reads whose ``writer`` is the
+      file's shared SqliteWriter
+    - csv: returns the shared CsvStore for the file (usable as a path)
+    - parquet: returns the shared ParquetStore for the directory
+    - postgres: returns the shared PostgresPool for the DSN
     """
     storage = get_storage(storage)
 
@@ -100,7 +251,7 @@ def init_db(dsn: str | None, *, storage: str | None = None):
         path = dsn or os.environ.get("SQLITE_PATH", DEFAULT_SQLITE)
         # Allow the same connection to be shared across threads (the monitor
         # server uses a threaded HTTP server and guards access with a lock).
-        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False, factory=SqliteConnection)
         # Better concurrency & reliability
         conn.execute("PRAGMA journal_mode=WAL;")
         conn.execute("PRAGMA synchronous=NORMAL;")
@@ -122,6 +273,7 @@ def init_db(dsn: str | None, *, storage: str | None = None):
                 query TEXT,
                 latitude REAL,
                 longitude REAL,
+                updated_at REAL NOT NULL DEFAULT 0,
                 UNIQUE(name, address)
             )
             """
@@ -129,29 +281,26 @@ def init_db(dsn: str | None, *, storage: str | None = None):
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_businesses_query ON businesses(query)"
         )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(businesses)")}
+        if "updated_at" not in columns:
+            # Rows from before the column existed are picked up by the first sync.
+            conn.execute("ALTER TABLE businesses ADD COLUMN updated_at REAL NOT NULL DEFAULT 0")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_businesses_updated_at ON businesses(updated_at)"
+        )
         conn.commit()
+        conn.path = path
+        if path != ":memory:":
+            # Every store for this file writes through one group-committing thread.
+            conn.writer = sqlite_writer(path)
         return conn
 
     elif storage == "csv":
         # Use the DSN/path if passed, else env/default
-        path = Path(dsn or os.environ.get("CSV_PATH", DEFAULT_CSV))
-        if not path.exists():
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with path.open("w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        "name",
-                        "address",
-                        "website",
-                        "phone",
-                        "reviews_average",
-                        "query",
-                        "latitude",
-                        "longitude",
-                    ]
-                )
-        return path
+        return open_csv_store(dsn or os.environ.get("CSV_PATH", DEFAULT_CSV))
+
+    elif storage == "parquet":
+        return open_parquet_store(dsn or os.environ.get("PARQUET_PATH", DEFAULT_PARQUET))
 
     else:
         # postgres
@@ -160,8 +309,8 @@ def init_db(dsn: str | None, *, storage: str | None = None):
                 "Postgres selected but psycopg2 is not installed. "
                 "Install with: pip install 'psycopg2-binary<3'"
             )
-        conn = psycopg2.connect(dsn or DEFAULT_DSN)
-        with conn.cursor() as cur:
+        pool = postgres_pool(dsn or DEFAULT_DSN)
+        with pool.connection() as conn, conn.cursor() as cur:
             cur.execute(
                 """
                 CREATE TABLE IF NOT EXISTS businesses (
@@ -173,12 +322,37 @@ def init_db(dsn: str | None, *, storage: str | None = None):
                     query TEXT,
                     latitude DOUBLE PRECISION,
                     longitude DOUBLE PRECISION,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
                     UNIQUE(name, address)
                 )
                 """
             )
-            conn.commit()
-        return conn
+            cur.execute(
+                "ALTER TABLE businesses ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()"
+            )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_businesses_updated_at ON businesses(updated_at)"
+            )
+        return pool
+
+
+def _csv_reader(conn) -> CsvStore:
+    """Use the open store, or a read-only view when given a plain path."""
+    return conn if isinstance(conn, CsvStore) else CsvStore(conn, readonly=True)
+
+
+def _parquet_reader(conn) -> ParquetStore:
+    """Use the open store, or a read-only view when given a directory path."""
+    return conn if isinstance(conn, ParquetStore) else ParquetStore(conn, readonly=True)
+
+
+def connect_sqlite_readonly(path: str) -> sqlite3.Connection:
+    """Open ``path`` read-only, e.g. for monitoring a database being written."""
+    conn = sqlite3.connect(
+        f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, timeout=30, check_same_thread=False
+    )
+    conn.execute("PRAGMA busy_timeout=30000;")
+    return conn
 
 
 def load_business_keys(conn, *, storage: str | None = None) -> set[tuple[str, str]]:
@@ -187,8 +361,7 @@ def load_business_keys(conn, *, storage: str | None = None) -> set[tuple[str, st
     keys: set[tuple[str, str]] = set()
 
     if storage == "cassandra":
-        rows = conn.execute("SELECT name, address FROM businesses")
-        for row in rows:
+        for row in TokenRangeScanner.from_env(conn).rows("name, address"):
             keys.add((row.name.strip().lower(), row.address.strip().lower()))
 
     elif storage == "sqlite":
@@ -198,96 +371,300 @@ def load_business_keys(conn, *, storage: str | None = None) -> set[tuple[str, st
             keys.add((n.strip().lower(), a.strip().lower()))
 
     elif storage == "csv":
-        path = Path(conn)
-        if path.exists():
-            with path.open() as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    keys.add((row["name"].strip().lower(), row["address"].strip().lower()))
+        keys.update(_csv_reader(conn).read_keys(0)[0])
+
+    elif storage == "parquet":
+        keys.update(_parquet_reader(conn).keys())
 
     else:
         # postgres
-        with conn.cursor() as cur:
+        with _postgres(conn) as pg, pg.cursor() as cur:
             cur.execute("SELECT name, address FROM businesses")
             keys.update((n.strip().lower(), a.strip().lower()) for n, a in cur.fetchall())
 
     return keys
 
 
+def load_business_key_tail(
+    conn,
+    since: int = 0,
+    *,
+    storage: str | None = None,
+    chunk_size: int = 10000,
+) -> tuple[Iterable[tuple[str, str]], int]:
+    """Return keys stored after position ``since`` and the current end position.
+
+    Positions are rowids for sqlite and byte offsets for csv, so a caller that
+    remembers the end position can later read only the rows added since.
+    Cassandra has no such position: every key is read, with a parallel
+    token-range scan, and the end position is always 0. Sqlite and Cassandra
+    keys are streamed, so consume them before using ``conn`` again.
+    """
+    storage = get_storage(storage)
+
+    if storage == "sqlite":
+        row = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM businesses").fetchone()
+        end = int(row[0])
+
+        def sqlite_keys() -> Iterator[tuple[str, str]]:
+            cur = conn.execute(
+                "SELECT name, address FROM businesses WHERE rowid > ? AND rowid <= ?",
+                (since, end),
+            )
+            try:
+                while rows := cur.fetchmany(chunk_size):
+                    for n, a in rows:
+                        yield n.strip().lower(), a.strip().lower()
+            finally:
+                cur.close()
+
+        return sqlite_keys(), end
+
+    if storage == "csv":
+        return _csv_reader(conn).read_keys(since)
+
+    if storage == "cassandra":
+        rows = TokenRangeScanner.from_env(conn).rows("name, address")
+        return ((row.name.strip().lower(), row.address.strip().lower()) for row in rows), 0
+
+    raise ValueError(f"Incremental key reads are not supported for {storage} storage")
+
+
+def business_snapshot_path(conn, *, storage: str | None = None) -> str | None:
+    """Return where the dedupe snapshot for this store lives, if it can have one."""
+    storage = get_storage(storage)
+    if storage == "sqlite":
+        row = conn.execute("PRAGMA database_list").fetchone()
+        return f"{row[2]}.keys" if row and row[2] else None
+    if storage == "csv":
+        return f"{Path(conn)}.keys"
+    return None
+
+
+def business_store_fingerprint(conn, *, storage: str | None = None) -> str:
+    """Return a digest of the first stored row, or "" when there is none.
+
+    Rows are only ever appended, so the first one stays the same while a
+    file grows and changes when the file is replaced. Only sqlite and csv
+    have a cheap first row; the other backends return "".
+    """
+    storage = get_storage(storage)
+    first = None
+    if storage == "sqlite":
+        first = conn.execute("SELECT name, address FROM businesses ORDER BY rowid LIMIT 1").fetchone()
+    elif storage == "csv":
+        first = next((values[:2] for values, _ in _csv_reader(conn).rows()), None)
+    return row_fingerprint(first)
+
+
+def business_store_scope(dsn: str, *, storage: str | None = None) -> str:
+    """Return a key naming the store at ``dsn``, for caches kept per store.
+
+    File backends are named by absolute path. The DSN is hashed so that
+    passwords never end up in a cache file.
+    """
+    storage = get_storage(storage)
+    location = str(Path(dsn).resolve()) if storage in {"sqlite", "csv", "parquet"} else dsn
+    return f"{storage}:{hashlib.blake2b(location.encode(), digest_size=8).hexdigest()}"
+
+
+def cassandra_prepare(session, cql: str):
+    """Prepare ``cql`` once per session and reuse the statement afterwards."""
+    statements = _prepared_statements.setdefault(session, {})
+    statement = statements.get(cql)
+    if statement is None:
+        statement = statements[cql] = session.prepare(cql)
+    return statement
+
+
+def _save_cassandra_batch(session, values_seq: list[tuple]) -> None:
+    """Write rows concurrently with a prepared statement.
+
+    Up to ``CASSANDRA_WRITE_CONCURRENCY`` (default 64) inserts are in flight
+    at once. Failed rows are retried ``CASSANDRA_WRITE_RETRIES`` times
+    (default 2) and then reported through :class:`BatchWriteError`.
+    """
+    from cassandra.concurrent import execute_concurrent
+
+    insert = cassandra_prepare(session, CASSANDRA_INSERT_BUSINESS)
+    concurrency = int(os.environ.get("CASSANDRA_WRITE_CONCURRENCY", "64"))
+    retries = int(os.environ.get("CASSANDRA_WRITE_RETRIES", "2"))
+
+    pending = list(values_seq)
+    written: list[tuple] = []
+    failures: list[tuple[tuple, Exception]] = []
+    for _attempt in range(retries + 1):
+        results = execute_concurrent(
+            session,
+            [(insert, values) for values in pending],
+            concurrency=concurrency,
+            raise_on_first_error=False,
+        )
+        failures = []
+        for values, (success, result) in zip(pending, results):
+            if success:
+                written.append(values)
+            else:
+                failures.append((values, result))
+        if not failures:
+            return
+        pending = [values for values, _ in failures]
+    raise BatchWriteError(failures, written)
+
+
 def save_business_batch(conn, values_seq: list[tuple], *, storage: str | None = None) -> None:
     """Insert or update multiple business rows using the active backend."""
     storage = get_storage(storage)
 
     if storage == "cassandra":
-        for values in values_seq:
-            conn.execute(
-                """
-                INSERT INTO businesses (
-                    name, address, website, phone, reviews_average, query, latitude, longitude
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                values,
-            )
+        _save_cassandra_batch(conn, values_seq)
 
     elif storage == "sqlite":
-        conn.executemany(
-            """
-            INSERT INTO businesses (
-                name, address, website, phone, reviews_average, query, latitude, longitude
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(name, address) DO UPDATE SET
-                website=excluded.website,
-                phone=excluded.phone,
-                reviews_average=excluded.reviews_average,
-                query=excluded.query,
-                latitude=excluded.latitude,
-                longitude=excluded.longitude
-            """,
-            values_seq,
-        )
-        conn.commit()
+        writer = getattr(conn, "writer", None)
+        if writer is not None:
+            writer.write(values_seq)
+        else:
+            conn.executemany(SQLITE_UPSERT_BUSINESS, values_seq)
+            conn.commit()
 
     elif storage == "csv":
-        path = Path(conn)
-        existing: set[tuple[str, str]] = set()
-        if path.exists():
-            with path.open() as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    existing.add((row["name"].strip().lower(), row["address"].strip().lower()))
-        with path.open("a", newline="") as f:
-            writer = csv.writer(f)
-            for values in values_seq:
-                key = (values[0].strip().lower(), values[1].strip().lower())
-                if key not in existing:
-                    writer.writerow(values)
-                    existing.add(key)
+        if isinstance(conn, CsvStore):
+            conn.append(values_seq)
+        else:
+            store = CsvStore(conn)
+            try:
+                store.append(values_seq)
+            finally:
+                store.close()
+
+    elif storage == "parquet":
+        # Rows are immutable once written, so existing businesses are kept.
+        conn.append(values_seq)
 
     else:
         # postgres
-        with conn.cursor() as cur:
-            cur.executemany(
+        from psycopg2.extras import execute_values
+
+        # One multi-row statement per batch; an upsert may touch each key
+        # only once per statement, so the last row for a key wins.
+        rows = list({(values[0], values[1]): values for values in values_seq}.values())
+        with _postgres(conn) as pg, pg.cursor() as cur:
+            execute_values(
+                cur,
                 """
                 INSERT INTO businesses (
                     name, address, website, phone, reviews_average, query, latitude, longitude
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ) VALUES %s
                 ON CONFLICT (name, address) DO UPDATE SET
                     website=EXCLUDED.website,
                     phone=EXCLUDED.phone,
                     reviews_average=EXCLUDED.reviews_average,
                     query=EXCLUDED.query,
                     latitude=EXCLUDED.latitude,
-                    longitude=EXCLUDED.longitude
+                    longitude=EXCLUDED.longitude,
+                    updated_at=now()
+                """,
+                rows,
+                page_size=max(len(rows), 1),
+            )
+
+
+def _insert_cassandra_if_absent(session, values_seq: list[tuple]) -> list[tuple]:
+    """Store the rows whose key is not in Cassandra yet and return them.
+
+    By default the existing keys are looked up with one ``IN`` query per ten
+    rows, and only the absent rows are written. ``CASSANDRA_LWT=1`` uses
+    ``INSERT ... IF NOT EXISTS`` instead, which is race-free across processes
+    but costs a Paxos round per row.
+    """
+    from cassandra.concurrent import execute_concurrent
+
+    concurrency = int(os.environ.get("CASSANDRA_WRITE_CONCURRENCY", "64"))
+    if os.environ.get("CASSANDRA_LWT", "").lower() in {"1", "true", "yes"}:
+        insert = cassandra_prepare(session, CASSANDRA_INSERT_BUSINESS.rstrip() + " IF NOT EXISTS")
+        results = execute_concurrent(
+            session,
+            [(insert, values) for values in values_seq],
+            concurrency=concurrency,
+            raise_on_first_error=False,
+        )
+        inserted: list[tuple] = []
+        failures: list[tuple[tuple, Exception]] = []
+        for values, (success, result) in zip(values_seq, results):
+            if not success:
+                failures.append((values, result))
+            elif result.was_applied:
+                inserted.append(values)
+        if failures:
+            raise BatchWriteError(failures, inserted)
+        return inserted
+
+    lookup = cassandra_prepare(
+        session, "SELECT name, address FROM businesses WHERE name IN ? AND address IN ?"
+    )
+    # Each lookup reads names x addresses partitions, so keep the groups small.
+    chunks = [values_seq[i : i + 10] for i in range(0, len(values_seq), 10)]
+    results = execute_concurrent(
+        session,
+        [
+            (lookup, (list({v[0] for v in chunk}), list({v[1] for v in chunk})))
+            for chunk in chunks
+        ],
+        concurrency=concurrency,
+        raise_on_first_error=True,
+    )
+    existing = {(row.name, row.address) for _success, rows in results for row in rows}
+    absent = [values for values in values_seq if (values[0], values[1]) not in existing]
+    if absent:
+        _save_cassandra_batch(session, absent)
+    return absent
+
+
+def insert_new_businesses(conn, values_seq: list[tuple], *, storage: str | None = None) -> list[tuple]:
+    """Insert the rows whose (name, address) is not stored yet and return them.
+
+    Existing rows are left untouched. Postgres and Cassandra answer in one
+    round-trip per batch and parquet checks its manifest; sqlite and csv
+    rely on the caller's complete key index and simply write every row.
+    """
+    storage = get_storage(storage)
+    if not values_seq:
+        return []
+
+    if storage == "cassandra":
+        return _insert_cassandra_if_absent(conn, values_seq)
+
+    if storage == "postgres":
+        from psycopg2.extras import execute_values
+
+        with _postgres(conn) as pg, pg.cursor() as cur:
+            returned = execute_values(
+                cur,
+                """
+                INSERT INTO businesses (
+                    name, address, website, phone, reviews_average, query, latitude, longitude
+                ) VALUES %s
+                ON CONFLICT (name, address) DO NOTHING
+                RETURNING name, address
                 """,
                 values_seq,
+                page_size=len(values_seq),
+                fetch=True,
             )
-        conn.commit()
+        new_keys = {(name, address) for name, address in returned}
+        return [values for values in values_seq if (values[0], values[1]) in new_keys]
+
+    if storage == "parquet":
+        return conn.append(values_seq)
+
+    save_business_batch(conn, values_seq, storage=storage)
+    return list(values_seq)
 
 
 def save_business(conn, values: tuple, *, storage: str | None = None) -> None:
     """Insert or update a single business row using the active backend."""
     storage = get_storage(storage)
-    if storage in {"sqlite", "postgres"}:
+    if storage == "sqlite":
         with conn:
             save_business_batch(conn, [values], storage=storage)
     else:
@@ -299,7 +676,18 @@ def close_db(conn, *, storage: str | None = None) -> None:
     storage = get_storage(storage)
     if storage == "cassandra":
         conn.cluster.shutdown()
+    elif isinstance(conn, CsvStore):
+        release_csv_store(conn)
+    elif isinstance(conn, ParquetStore):
+        release_parquet_store(conn)
+    elif isinstance(conn, PostgresPool):
+        # The pool closes once the last store using it is done.
+        _release_postgres_pool(conn)
     elif storage in {"postgres", "sqlite"}:
+        writer = getattr(conn, "writer", None)
+        if writer is not None:
+            conn.writer = None
+            release_sqlite_writer(writer)
         conn.close()
     # csv storage uses a file path so nothing to close
 
@@ -312,20 +700,17 @@ def count_businesses(conn, *, storage: str | None = None) -> int | None:
         row = cur.fetchone()
         return int(row[0]) if row else 0
     if storage == "postgres":
-        with conn.cursor() as cur:
+        with _postgres(conn) as pg, pg.cursor() as cur:
             cur.execute("SELECT COUNT(*) FROM businesses")
             res = cur.fetchone()
             return int(res[0]) if res else 0
     if storage == "csv":
-        path = Path(conn)
-        if not path.exists():
-            return 0
-        with path.open() as f:
-            # subtract header
-            return max(sum(1 for _ in f) - 1, 0)
+        return _csv_reader(conn).count()
+    if storage == "parquet":
+        return _parquet_reader(conn).count()
     if storage == "cassandra":
-        # Counting rows in Cassandra is expensive; return None to signal unsupported.
-        return None
+        # One COUNT(*) per token range, run in parallel; still a full scan.
+        return TokenRangeScanner.from_env(conn).count()
     return None
 
 
@@ -350,7 +735,7 @@ def fetch_recent_businesses(
         )
         rows = cur.fetchall()
     elif storage == "postgres":
-        with conn.cursor() as cur:
+        with _postgres(conn) as pg, pg.cursor() as cur:
             cur.execute(
                 """
                 SELECT name, address, query, latitude, longitude
@@ -362,26 +747,22 @@ def fetch_recent_businesses(
             )
             rows = cur.fetchall()
     elif storage == "csv":
-        path = Path(conn)
         rows = []
-        if path.exists():
-            from collections import deque
-
-            buffer = deque(maxlen=limit)
-            with path.open() as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    buffer.append(row)
-            for row in buffer:
-                rows.append(
-                    (
-                        row.get("name"),
-                        row.get("address"),
-                        row.get("query"),
-                        row.get("latitude"),
-                        row.get("longitude"),
-                    )
+        for row in _csv_reader(conn).tail(limit):
+            rows.append(
+                (
+                    row.get("name"),
+                    row.get("address"),
+                    row.get("query"),
+                    row.get("latitude"),
+                    row.get("longitude"),
                 )
+            )
+    elif storage == "parquet":
+        rows = [
+            (row["name"], row["address"], row["query"], row["latitude"], row["longitude"])
+            for row in _parquet_reader(conn).recent(limit)
+        ]
     elif storage == "cassandra":
         result = conn.execute(
             "SELECT name, address, query, latitude, longitude FROM businesses LIMIT %s",
@@ -399,3 +780,236 @@ def fetch_recent_businesses(
         }
         for row in rows
     ]
+
+
+@dataclass(frozen=True)
+class BusinessFilter:
+    """Restrict :func:`iter_businesses` to a city, a search term or an area.
+
+    ``city`` and ``term`` are compared case-insensitively with the two parts
+    of the stored ``"City" term`` query. ``bbox`` is
+    ``(min_lat, min_lon, max_lat, max_lon)``.
+    """
+
+    city: str | None = None
+    term: str | None = None
+    bbox: tuple[float, float, float, float] | None = None
+
+    def matches(self, values: tuple) -> bool:
+        if self.city is not None or self.term is not None:
+            city, term = split_query(values[5] or "")
+            if self.city is not None and city.lower() != self.city.lower():
+                return False
+            if self.term is not None and term.lower() != self.term.lower():
+                return False
+        if self.bbox is not None:
+            if values[6] is None or values[7] is None:
+                return False
+            min_lat, min_lon, max_lat, max_lon = self.bbox
+            return min_lat <= float(values[6]) <= max_lat and min_lon <= float(values[7]) <= max_lon
+        return True
+
+    def sql(self, placeholder: str = "?") -> tuple[str, list]:
+        """Return a WHERE clause that narrows a SQL scan, and its parameters.
+
+        The clause may let through a few extra rows (LIKE wildcards in a city
+        name); :meth:`matches` has the final say.
+        """
+        clauses = ["1 = 1"]
+        params: list = []
+        if self.city is not None:
+            clauses.append(f"LOWER(query) LIKE {placeholder}")
+            params.append(f'"{self.city.lower()}"%')
+        if self.term is not None:
+            clauses.append(f"LOWER(query) LIKE {placeholder}")
+            params.append(f"%{self.term.lower()}")
+        if self.bbox is not None:
+            clauses.append(f"latitude BETWEEN {placeholder} AND {placeholder}")
+            clauses.append(f"longitude BETWEEN {placeholder} AND {placeholder}")
+            min_lat, min_lon, max_lat, max_lon = self.bbox
+            params.extend([min_lat, max_lat, min_lon, max_lon])
+        return " AND ".join(clauses), params
+
+
+BUSINESS_COLUMNS = "name, address, website, phone, reviews_average, query, latitude, longitude"
+
+
+def _float_or_none(value) -> float | None:
+    return float(value) if value not in (None, "") else None
+
+
+def _typed_csv_row(values: list[str]) -> tuple:
+    """Turn a CSV row's numeric fields back into numbers."""
+    return (
+        values[0],
+        values[1],
+        values[2],
+        values[3],
+        _float_or_none(values[4]),
+        values[5],
+        _float_or_none(values[6]),
+        _float_or_none(values[7]),
+    )
+
+
+def iter_businesses(
+    conn,
+    *,
+    storage: str | None = None,
+    where: BusinessFilter | None = None,
+    chunk_size: int = 5000,
+) -> Iterator[list[tuple]]:
+    """Yield stored rows in chunks of up to ``chunk_size`` without loading them all.
+
+    Rows are tuples in ``BUSINESS_COLUMNS`` order. Postgres reads through a
+    server-side cursor, Cassandra with a parallel token-range scan, sqlite
+    and csv stream from the file and parquet only opens the matching
+    partitions.
+    """
+    storage = get_storage(storage)
+    where = where or BusinessFilter()
+    columns = BUSINESS_COLUMNS
+
+    def chunks(rows) -> Iterator[list[tuple]]:
+        chunk: list[tuple] = []
+        for values in rows:
+            if where.matches(values):
+                chunk.append(values)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    if storage == "sqlite":
+        clause, params = where.sql("?")
+        cur = conn.execute(f"SELECT {columns} FROM businesses WHERE {clause} ORDER BY rowid", params)
+        try:
+            # The cursor steps through the table; rows are not fetched up front.
+            yield from chunks(cur)
+        finally:
+            cur.close()
+
+    elif storage == "postgres":
+        clause, params = where.sql("%s")
+        with _postgres(conn) as pg, pg.cursor(name="iter_businesses") as cur:
+            cur.itersize = chunk_size
+            cur.execute(f"SELECT {columns} FROM businesses WHERE {clause}", params)
+            yield from chunks(cur)
+
+    elif storage == "csv":
+        yield from chunks(
+            _typed_csv_row(values) for values, _end in _csv_reader(conn).rows() if len(values) == 8
+        )
+
+    elif storage == "parquet":
+        batches = _parquet_reader(conn).iter_rows(city=where.city, term=where.term, batch_size=chunk_size)
+        yield from chunks(values for batch in batches for values in batch)
+
+    elif storage == "cassandra":
+        # Filters would need ALLOW FILTERING; rows are filtered here instead.
+        scanner = TokenRangeScanner.from_env(conn, page_size=chunk_size)
+        yield from chunks(tuple(row) for row in scanner.rows(columns))
+
+
+def iter_business_changes(
+    conn,
+    since: Any = 0,
+    *,
+    storage: str | None = None,
+    chunk_size: int = 5000,
+    overlap: float = 0.0,
+) -> Iterator[tuple[list[tuple], Any]]:
+    """Yield rows added or changed after the high-water mark ``since``.
+
+    Each chunk comes with the mark to resume from once it has been copied;
+    ``0`` means from the start. The mark is ``[updated_at, rowid]`` for
+    sqlite, ``updated_at`` in Unix time for postgres, a byte offset for csv,
+    a manifest row id for parquet and a write time in microseconds for
+    cassandra. The last chunk may be empty and only carry the final mark.
+
+    SQLite, Postgres and Cassandra re-read from ``overlap`` seconds before
+    the mark so rows from transactions that committed late are not missed.
+    Rows may therefore be yielded twice; targets upsert or deduplicate them.
+    """
+    storage = get_storage(storage)
+
+    if storage == "sqlite":
+        mark = list(since) if since else [-1.0, 0]
+        updated_at, rowid = mark
+        if updated_at > 0:
+            # julianday('now') only resolves milliseconds, and an update keeps
+            # its old rowid, so a row committed after the mark can sort
+            # before it. Re-read the overlap window instead of trusting the
+            # rowid. Rows from before updated_at existed (0) were passed by
+            # the keyset and are not read again.
+            updated_at, rowid = updated_at - overlap, 0
+        cur = conn.execute(
+            f"""
+            SELECT {BUSINESS_COLUMNS}, updated_at, rowid FROM businesses
+            WHERE (updated_at, rowid) > (?, ?)
+            ORDER BY updated_at, rowid
+            """,
+            (updated_at, rowid),
+        )
+        try:
+            while rows := cur.fetchmany(chunk_size):
+                mark = max(mark, [rows[-1][8], rows[-1][9]])
+                yield [row[:8] for row in rows], mark
+        finally:
+            cur.close()
+
+    elif storage == "postgres":
+        start = max(since - overlap, 0) if since else 0
+        with _postgres(conn) as pg, pg.cursor(name="iter_business_changes") as cur:
+            cur.itersize = chunk_size
+            cur.execute(
+                f"""
+                SELECT {BUSINESS_COLUMNS}, EXTRACT(EPOCH FROM updated_at) FROM businesses
+                WHERE updated_at >= to_timestamp(%s)
+                ORDER BY updated_at
+                """,
+                (start,),
+            )
+            while rows := cur.fetchmany(chunk_size):
+                yield [tuple(row[:8]) for row in rows], max(since, float(rows[-1][8]))
+
+    elif storage == "csv":
+        store = _csv_reader(conn)
+        position = int(since)
+        if position > store.size():
+            # The file is shorter than the mark, so it was replaced; start over.
+            position = 0
+        chunk: list[tuple] = []
+        for values, position in store.rows(position):
+            if len(values) == 8:
+                chunk.append(_typed_csv_row(values))
+            if len(chunk) >= chunk_size:
+                yield chunk, position
+                chunk = []
+        yield chunk, position
+
+    elif storage == "parquet":
+        yield from _parquet_reader(conn).changes(int(since), batch_size=chunk_size)
+
+    elif storage == "cassandra":
+        # Write times are not indexed, so every row is read and filtered here.
+        start = max(since - overlap * 1_000_000, 0) if since else 0
+        scanner = TokenRangeScanner.from_env(conn, page_size=chunk_size)
+        newest = since
+        chunk = []
+        for row in scanner.rows(f"{BUSINESS_COLUMNS}, writetime(query)"):
+            written = row[8] or 0
+            if written < start:
+                continue
+            newest = max(newest, written)
+            chunk.append(tuple(row[:8]))
+            if len(chunk) >= chunk_size:
+                # Rows are not in write-time order, so the mark only moves at the end.
+                yield chunk, since
+                chunk = []
+        yield chunk, newest
+
+    else:
+        raise ValueError(f"Unknown storage backend {storage!r}")
+
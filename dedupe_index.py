@@ -0,0 +1,348 @@
+"""Process-wide record of which businesses are stored or being stored."""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+Key = tuple[str, str]
+# ``loader(since)`` returns the keys stored after position ``since`` and the
+# current end position (see ``db.load_business_key_tail``).
+TailLoader = Callable[[int], tuple[Iterable[Key], int]]
+
+_SNAPSHOT_MAGIC = b"MMKEYS1\0"
+# magic, hash count, end position, bloom bits, bloom hash count, store identity
+_SNAPSHOT_HEADER = struct.Struct("<8sQQQQQ16x")
+# Fold the tail into a new snapshot once it exceeds this many keys or 5% of
+# the snapshot, whichever is larger.
+_REWRITE_MIN_TAIL = 10000
+
+
+def business_key(name: str, address: str) -> Key:
+    return (name.strip().lower(), address.strip().lower())
+
+
+def key_hash(key: Key) -> int:
+    """64-bit hash of a normalised key.
+
+    Collisions are possible but rare (about one in 10^6 for ten million
+    businesses). A colliding business looks already stored, so it is
+    skipped without being saved.
+    """
+    digest = hashlib.blake2b("\x1f".join(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def row_fingerprint(first: Optional[Sequence[str]]) -> str:
+    """Hex digest of a store's first ``(name, address)`` row, or "" for none."""
+    if not first:
+        return ""
+    return hashlib.blake2b("\x1f".join(first).encode(), digest_size=8).hexdigest()
+
+
+def _sorted_hashes(keys: Iterable[Key], chunk_size: int = 1 << 18) -> array:
+    """Hash ``keys`` into a sorted, duplicate-free array.
+
+    Keys are hashed and sorted ``chunk_size`` at a time and the chunks are
+    merged, so a full load holds 8-byte hashes rather than every key string.
+    """
+    runs: list[array] = []
+    chunk = array("Q")
+    for key in keys:
+        chunk.append(key_hash(key))
+        if len(chunk) >= chunk_size:
+            runs.append(array("Q", sorted(chunk)))
+            chunk = array("Q")
+    if chunk:
+        runs.append(array("Q", sorted(chunk)))
+    merged = array("Q")
+    previous = None
+    for value in heapq.merge(*runs):
+        if value != previous:
+            merged.append(value)
+            previous = value
+    return merged
+
+
+class BloomFilter:
+    """Bit array in front of the sorted hashes; a miss needs no binary search."""
+
+    def __init__(self, bits: int, hashes: int, data: Optional[Sequence[int]] = None) -> None:
+        self.bits = bits
+        self.hashes = hashes
+        self.data = data if data is not None else bytearray(bits // 8)
+
+    @classmethod
+    def for_count(cls, count: int, bits_per_key: int) -> "BloomFilter":
+        bits = max(64, -(-count * bits_per_key // 64) * 64)
+        return cls(bits, max(1, round(bits_per_key * math.log(2))))
+
+    def _positions(self, value: int) -> Iterable[int]:
+        low, high = value & 0xFFFFFFFF, (value >> 32) | 1
+        return ((low + i * high) % self.bits for i in range(self.hashes))
+
+    def add(self, value: int) -> None:
+        for pos in self._positions(value):
+            self.data[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, value: int) -> bool:
+        return all(self.data[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class DedupeIndex:
+    """Shared ``(name, address)`` index with check-and-reserve semantics.
+
+    One instance is shared by every :class:`storage_manager.BusinessStore` in
+    the process, so the stored keys are loaded once rather than per worker.
+    :meth:`reserve` claims a key atomically; the first caller wins and every
+    other worker treats the business as a duplicate. A failed write gives its
+    keys back with :meth:`release` so they can be tried again; a finished one
+    marks them stored with :meth:`confirm`.
+
+    Keys are kept as 64-bit hashes: a sorted array of the stored ones plus a
+    small set of those added during the run. The sorted array is saved as a
+    snapshot file that is memory-mapped on the next start, after which only
+    rows added since the snapshot are read from the store. With
+    ``bloom_bits_per_key`` a Bloom filter is saved alongside it and consulted
+    before the binary search.
+
+    ``complete`` says whether the index holds every stored key. When it does
+    not (Postgres, Cassandra) a miss still has to be confirmed by the store.
+    ``preload_keys`` (default: ``complete``) loads the stored keys anyway,
+    so known businesses are skipped without a round-trip.
+    """
+
+    def __init__(
+        self,
+        *,
+        complete: bool = True,
+        bloom_bits_per_key: int = 0,
+        preload_keys: Optional[bool] = None,
+    ) -> None:
+        self.complete = complete
+        self.preload_keys = complete if preload_keys is None else preload_keys
+        self.bloom_bits_per_key = bloom_bits_per_key
+        self.position = 0
+        self.identity = 0
+        self._base: Sequence[int] = array("Q")
+        self._bloom: Optional[BloomFilter] = None
+        self._added: set[int] = set()
+        # Reserved keys whose write has not finished yet.
+        self._claimed: set[int] = set()
+        self._map: Optional[mmap.mmap] = None
+        self._views: list[memoryview] = []
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @classmethod
+    def for_storage(
+        cls,
+        storage: str,
+        *,
+        bloom_bits_per_key: int = 0,
+        preload_keys: bool = False,
+    ) -> "DedupeIndex":
+        # Preloading every key is only cheap for the local backends; Cassandra
+        # can opt in and read them with a parallel token-range scan.
+        complete = storage in {"sqlite", "csv"}
+        return cls(
+            complete=complete,
+            bloom_bits_per_key=bloom_bits_per_key,
+            preload_keys=complete or (preload_keys and storage == "cassandra"),
+        )
+
+    def preload(
+        self,
+        loader: TailLoader,
+        *,
+        snapshot: Optional[str] = None,
+        identity: str = "",
+    ) -> bool:
+        """Fill the index unless that already happened.
+
+        With a ``snapshot`` path the stored hashes are mapped from that file
+        and ``loader`` only reads the rows added after it was written; the
+        snapshot is created or refreshed when needed. ``identity`` (see
+        :func:`db.business_store_fingerprint`) is saved in the snapshot, and
+        a snapshot written for a different store is rebuilt. Returns True
+        for the call that performed the load.
+        """
+        with self._lock:
+            if self._loaded:
+                return False
+            self._loaded = True
+            self.identity = int(identity, 16) if identity else 0
+            if self.preload_keys:
+                self._load(loader, snapshot)
+            return True
+
+    def _load(self, loader: TailLoader, snapshot: Optional[str]) -> None:
+        since = self._map_snapshot(snapshot) if snapshot else 0
+        keys, end = loader(since)
+        if since and end < since:
+            # The store is older than the snapshot, e.g. it was replaced.
+            logger.info("Dedupe snapshot %s is ahead of the store; rebuilding", snapshot)
+            self._unmap()
+            since = 0
+            keys, end = loader(0)
+        self.position = end
+        if not since:
+            self._base = _sorted_hashes(keys)
+            self._build_bloom()
+            if snapshot:
+                self._write_snapshot(snapshot)
+            return
+        tail = {key_hash(key) for key in keys}
+        tail = {value for value in tail if not self._in_base(value)}
+        missing_bloom = bool(self.bloom_bits_per_key) and self._bloom is None
+        if missing_bloom or len(tail) > max(_REWRITE_MIN_TAIL, len(self._base) // 20):
+            merged = array("Q", heapq.merge(self._base, sorted(tail)))
+            self._unmap()
+            self._base = merged
+            self._build_bloom()
+            self._write_snapshot(snapshot)
+            return
+        self._added = tail
+
+    def _map_snapshot(self, path: str) -> int:
+        """Map ``path`` as the base array and return its end position (0 if unusable)."""
+        if sys.byteorder != "little" or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return 0
+        try:
+            magic, count, position, bloom_bits, bloom_hashes, identity = _SNAPSHOT_HEADER.unpack_from(mapped)
+        except struct.error:
+            mapped.close()
+            return 0
+        start = _SNAPSHOT_HEADER.size
+        bloom_start = start + count * 8
+        if magic != _SNAPSHOT_MAGIC or len(mapped) != bloom_start + bloom_bits // 8:
+            mapped.close()
+            logger.warning("Ignoring malformed dedupe snapshot %s", path)
+            return 0
+        if count and identity != self.identity:
+            # The first stored row differs: the store was replaced, even if
+            # the new one is at least as long as the old.
+            mapped.close()
+            logger.info("Dedupe snapshot %s belongs to another store; rebuilding", path)
+            return 0
+        self._map = mapped
+        view = memoryview(mapped)
+        hashes = view[start:bloom_start].cast("Q")
+        self._views = [view, hashes]
+        self._base = hashes
+        if bloom_bits and self.bloom_bits_per_key:
+            bloom_view = view[bloom_start:]
+            self._views.append(bloom_view)
+            self._bloom = BloomFilter(bloom_bits, bloom_hashes, bloom_view)
+        return position
+
+    def _unmap(self) -> None:
+        self._bloom = None
+        self._base = array("Q")
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _build_bloom(self) -> None:
+        self._bloom = None
+        if not self.bloom_bits_per_key:
+            return
+        bloom = BloomFilter.for_count(len(self._base), self.bloom_bits_per_key)
+        for value in self._base:
+            bloom.add(value)
+        self._bloom = bloom
+
+    def _write_snapshot(self, path: str) -> None:
+        bloom = self._bloom
+        header = _SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC,
+            len(self._base),
+            self.position,
+            bloom.bits if bloom else 0,
+            bloom.hashes if bloom else 0,
+            self.identity,
+        )
+        # CsvStore and BusinessStore may refresh the same snapshot at once.
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(memoryview(self._base).cast("B"))
+                if bloom is not None:
+                    f.write(bloom.data)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Could not write dedupe snapshot %s: %s", path, exc)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _in_base(self, value: int) -> bool:
+        if self._bloom is not None and not self._bloom.might_contain(value):
+            return False
+        base = self._base
+        i = bisect_left(base, value)
+        return i < len(base) and base[i] == value
+
+    def _has(self, value: int) -> bool:
+        return value in self._added or self._in_base(value)
+
+    def __contains__(self, key: Key) -> bool:
+        return self._has(key_hash(key))
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._added)
+
+    def reserve(self, key: Key) -> bool:
+        """Claim ``key``; return False when it is already stored or claimed."""
+        value = key_hash(key)
+        with self._lock:
+            if self._has(value):
+                return False
+            self._added.add(value)
+            self._claimed.add(value)
+            return True
+
+    def release(self, keys: Iterable[Key]) -> None:
+        values = {key_hash(key) for key in keys}
+        with self._lock:
+            self._added.difference_update(values)
+            self._claimed.difference_update(values)
+
+    def confirm(self, keys: Iterable[Key]) -> None:
+        """Mark reserved keys as stored once their write has finished."""
+        values = {key_hash(key) for key in keys}
+        with self._lock:
+            self._claimed.difference_update(values)
+
+    def is_stored(self, key: Key) -> bool:
+        """Return True when ``key`` is known to be stored, not merely reserved."""
+        value = key_hash(key)
+        with self._lock:
+            return value not in self._claimed and self._has(value)
+
+    def add_many(self, keys: Iterable[Key]) -> None:
+        with self._lock:
+            self._added.update(key_hash(key) for key in keys)
+
+    def close(self) -> None:
+        with self._lock:
+            self._unmap()
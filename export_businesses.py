@@ -0,0 +1,324 @@
+"""Stream stored businesses from any backend to xlsx, csv(.gz), NDJSON or Parquet."""
+from __future__ import annotations
+
+import abc
+import argparse
+import csv
+import gzip
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Optional
+
+from csv_store import CSV_COLUMNS
+from db import (
+    BusinessFilter,
+    close_db,
+    connect_sqlite_readonly,
+    get_dsn,
+    get_storage,
+    init_db,
+    iter_businesses,
+)
+from parquet_store import ParquetStore, business_schema
+
+logger = logging.getLogger(__name__)
+
+# Longest suffix first so ``.csv.gz`` is not taken for ``.gz``.
+FORMATS = {
+    ".csv.gz": "csv.gz",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+    ".xlsx": "xlsx",
+    ".csv": "csv",
+}
+# Rows per sheet Excel can hold, leaving one for the header.
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def detect_format(path: Path) -> str:
+    name = path.name.lower()
+    for suffix, fmt in FORMATS.items():
+        if name.endswith(suffix):
+            return fmt
+    raise ValueError(f"Cannot tell the export format from {path.name}; pass --format")
+
+
+class ExportWriter(abc.ABC):
+    """Write rows to ``path`` and start a new part every ``max_rows`` rows.
+
+    Parts after the first are named like CSV segments: ``results.1.csv.gz``,
+    ``results.2.csv.gz``, ... Subclasses open, fill and close one part.
+    """
+
+    extension = ""
+
+    def __init__(self, path: Path, *, max_rows: int = 0) -> None:
+        self.path = path
+        self.max_rows = max_rows
+        self.rows = 0
+        self.parts: list[str] = []
+        self._part_rows = 0
+
+    def part_path(self, index: int) -> Path:
+        if index == 0:
+            return self.path
+        name = self.path.name
+        if name.lower().endswith(self.extension):
+            base, suffix = name[: -len(self.extension)], name[-len(self.extension) :]
+        else:
+            base, suffix = name, ""
+        return self.path.with_name(f"{base}.{index}{suffix}")
+
+    def write(self, rows: list[tuple]) -> None:
+        while rows:
+            if not self.parts or (self.max_rows and self._part_rows >= self.max_rows):
+                self._next_part()
+            room = self.max_rows - self._part_rows if self.max_rows else len(rows)
+            chunk, rows = rows[:room], rows[room:]
+            self._write_rows(chunk)
+            self._part_rows += len(chunk)
+            self.rows += len(chunk)
+
+    def _next_part(self) -> None:
+        if self.parts:
+            self._close_part()
+        self.parts.append(self._open_part(len(self.parts)))
+        self._part_rows = 0
+
+    def close(self) -> None:
+        if not self.parts:
+            # An empty export still produces a file with the header.
+            self._next_part()
+        self._close_part()
+
+    @abc.abstractmethod
+    def _open_part(self, index: int) -> str:
+        """Start part ``index`` and return its name."""
+
+    @abc.abstractmethod
+    def _write_rows(self, rows: list[tuple]) -> None:
+        """Append ``rows`` to the open part."""
+
+    @abc.abstractmethod
+    def _close_part(self) -> None:
+        """Finish the open part."""
+
+
+class CsvExportWriter(ExportWriter):
+    def __init__(self, path: Path, *, max_rows: int = 0, compress: bool = False) -> None:
+        super().__init__(path, max_rows=max_rows)
+        self.compress = compress
+        self.extension = ".csv.gz" if compress else ".csv"
+        self._handle: Any = None
+        self._writer: Any = None
+
+    def _open_part(self, index: int) -> str:
+        path = self.part_path(index)
+        if self.compress:
+            self._handle = gzip.open(path, "wt", newline="", encoding="utf-8")
+        else:
+            self._handle = path.open("w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._handle)
+        self._writer.writerow(CSV_COLUMNS)
+        return str(path)
+
+    def _write_rows(self, rows: list[tuple]) -> None:
+        self._writer.writerows(rows)
+
+    def _close_part(self) -> None:
+        self._handle.close()
+
+
+class NdjsonExportWriter(ExportWriter):
+    extension = ".ndjson"
+
+    def __init__(self, path: Path, *, max_rows: int = 0) -> None:
+        super().__init__(path, max_rows=max_rows)
+        if path.name.lower().endswith(".jsonl"):
+            self.extension = ".jsonl"
+        self._handle: Any = None
+
+    def _open_part(self, index: int) -> str:
+        path = self.part_path(index)
+        self._handle = path.open("w", encoding="utf-8")
+        return str(path)
+
+    def _write_rows(self, rows: list[tuple]) -> None:
+        self._handle.write(
+            "".join(json.dumps(dict(zip(CSV_COLUMNS, values)), ensure_ascii=False) + "\n" for values in rows)
+        )
+
+    def _close_part(self) -> None:
+        self._handle.close()
+
+
+class ParquetExportWriter(ExportWriter):
+    """Each chunk becomes one row group of a zstd-compressed file."""
+
+    extension = ".parquet"
+
+    def __init__(self, path: Path, *, max_rows: int = 0) -> None:
+        super().__init__(path, max_rows=max_rows)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa, self._pq = pa, pq
+        self._schema = business_schema()
+        self._writer: Any = None
+
+    def _open_part(self, index: int) -> str:
+        path = self.part_path(index)
+        self._writer = self._pq.ParquetWriter(path, self._schema, compression="zstd")
+        return str(path)
+
+    def _write_rows(self, rows: list[tuple]) -> None:
+        columns = list(zip(*rows))
+        table = self._pa.Table.from_arrays(
+            [self._pa.array(column, type=field.type) for column, field in zip(columns, self._schema)],
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def _close_part(self) -> None:
+        self._writer.close()
+
+
+class XlsxExportWriter(ExportWriter):
+    """One workbook in write-only mode; parts are sheets rather than files."""
+
+    def __init__(self, path: Path, *, max_rows: int = 0) -> None:
+        super().__init__(path, max_rows=min(max_rows or EXCEL_MAX_ROWS, EXCEL_MAX_ROWS))
+        from openpyxl import Workbook
+
+        # Write-only workbooks stream rows to disk instead of keeping cells.
+        self._workbook = Workbook(write_only=True)
+        self._sheet: Any = None
+
+    def _open_part(self, index: int) -> str:
+        title = "businesses" if index == 0 else f"businesses_{index + 1}"
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.append(CSV_COLUMNS)
+        return f"{self.path}#{title}"
+
+    def _write_rows(self, rows: list[tuple]) -> None:
+        for values in rows:
+            self._sheet.append(list(values))
+
+    def _close_part(self) -> None:
+        pass
+
+    def close(self) -> None:
+        super().close()
+        self._workbook.save(self.path)
+
+
+def open_writer(path: Path, fmt: str, *, max_rows: int = 0) -> ExportWriter:
+    if fmt == "xlsx":
+        return XlsxExportWriter(path, max_rows=max_rows)
+    if fmt in {"csv", "csv.gz"}:
+        return CsvExportWriter(path, max_rows=max_rows, compress=fmt == "csv.gz")
+    if fmt == "ndjson":
+        return NdjsonExportWriter(path, max_rows=max_rows)
+    if fmt == "parquet":
+        return ParquetExportWriter(path, max_rows=max_rows)
+    raise ValueError(f"Unknown export format {fmt!r}")
+
+
+def export_businesses(
+    conn,
+    output: Path,
+    *,
+    storage: Optional[str] = None,
+    fmt: Optional[str] = None,
+    max_rows: int = 0,
+    where: Optional[BusinessFilter] = None,
+    chunk_size: int = 5000,
+) -> ExportWriter:
+    """Copy the matching businesses from ``conn`` to ``output`` chunk by chunk.
+
+    Memory use is bounded by ``chunk_size`` rather than the table size.
+    Returns the closed writer, whose ``rows`` and ``parts`` describe the
+    export.
+    """
+    storage = get_storage(storage)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    writer = open_writer(output, fmt or detect_format(output), max_rows=max_rows)
+    try:
+        for chunk in iter_businesses(conn, storage=storage, where=where, chunk_size=chunk_size):
+            writer.write(chunk)
+            logger.debug("Exported %d rows", writer.rows)
+    finally:
+        writer.close()
+    return writer
+
+
+def open_source(dsn: str, storage: str):
+    """Open ``dsn`` for reading without taking part in concurrent writes."""
+    if storage == "sqlite":
+        return connect_sqlite_readonly(dsn)
+    if storage == "csv":
+        return Path(dsn)
+    if storage == "parquet":
+        return ParquetStore(dsn, readonly=True)
+    return init_db(dsn, storage=storage)
+
+
+def close_source(conn, storage: str) -> None:
+    if isinstance(conn, (sqlite3.Connection, ParquetStore)):
+        conn.close()
+    elif storage != "csv":
+        close_db(conn, storage=storage)
+
+
+def _bbox(value: str) -> tuple[float, float, float, float]:
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("expected min_lat,min_lon,max_lat,max_lon")
+    return parts[0], parts[1], parts[2], parts[3]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export stored businesses without loading them into memory")
+    parser.add_argument("output", type=Path, help="Output file; the suffix picks the format")
+    parser.add_argument("--store", choices=["postgres", "cassandra", "sqlite", "csv", "parquet"], help="Storage backend")
+    parser.add_argument("--dsn", help="DSN or path of the store (defaults as for the scraper)")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="Override the format")
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=0,
+        help="Start a new file (or sheet for xlsx) after this many rows",
+    )
+    parser.add_argument("--city", help="Only businesses found while searching this city")
+    parser.add_argument("--term", "--query", dest="term", help="Only businesses found for this search term")
+    parser.add_argument("--bbox", type=_bbox, help="min_lat,min_lon,max_lat,max_lon")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows read per round-trip")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    storage = get_storage(args.store)
+    dsn = args.dsn or get_dsn(storage=storage)
+    conn = open_source(dsn, storage)
+    try:
+        writer = export_businesses(
+            conn,
+            args.output,
+            storage=storage,
+            fmt=args.format,
+            max_rows=args.max_rows,
+            where=BusinessFilter(city=args.city, term=args.term, bbox=args.bbox),
+            chunk_size=args.chunk_size,
+        )
+    finally:
+        close_source(conn, storage)
+    logger.info("Exported %d rows to %s", writer.rows, ", ".join(writer.parts))
+
+
+if __name__ == "__main__":
+    main()
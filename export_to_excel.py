@@ -1,18 +1,17 @@
-import psycopg2
 from pathlib import Path
 import sys
 
-import pandas as pd
+from db import close_db, init_db
+from export_businesses import export_businesses
 
 
 def export_to_excel(dsn: str, excel_path: Path) -> None:
-    conn = psycopg2.connect(dsn)
-    df = pd.read_sql_query(
-        "SELECT name, address, website, phone, reviews_average, query, latitude, longitude FROM businesses",
-        conn,
-    )
-    df.to_excel(excel_path, index=False)
-    conn.close()
+    # Kept for existing scripts; export_businesses.py handles every backend.
+    conn = init_db(dsn, storage="postgres")
+    try:
+        export_businesses(conn, excel_path, storage="postgres", fmt="xlsx")
+    finally:
+        close_db(conn, storage="postgres")
 
 
 if __name__ == "__main__":
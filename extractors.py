@@ -0,0 +1,255 @@
+"""In-page extractors that read Google Maps listing data in a single round-trip."""
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Sequence
+
+from playwright.async_api import Page
+
+from storage_manager import BusinessRecord
+
+_COORDS_RE = re.compile(r"@(-?\d+\.\d+),(-?\d+\.\d+)")
+_PLACE_COORDS_RE = re.compile(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)")
+_PHONE_RE = re.compile(r"^\+?[\d\s().-]{7,}$")
+_RATING_LINE_RE = re.compile(r"^\d+[.,]\d\s*\(")
+_PLACE_ID_RE = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ListingSelectors:
+    """CSS selectors for the fields shown in a listing's detail panel."""
+
+    name: str = "h1.DUwDvf.lfPIob"
+    address: str = "button[data-item-id='address'] div[class*='fontBodyMedium']"
+    website: str = "a[data-item-id='authority'] div[class*='fontBodyMedium']"
+    phone: str = "button[data-item-id*='phone'] div[class*='fontBodyMedium']"
+    reviews: str = "div[jsaction='pane.reviewChart.moreReviews'] div[role='img']"
+
+
+# Runs inside the page and returns every field at once so a listing costs a
+# single evaluate() call instead of a count()/inner_text() pair per field.
+_EXTRACT_SCRIPT = """
+(selectors) => {
+    const text = (selector) => {
+        const el = document.querySelector(selector);
+        return el ? (el.innerText || "").trim() : "";
+    };
+    const reviews = document.querySelector(selectors.reviews);
+    return {
+        name: text(selectors.name),
+        address: text(selectors.address),
+        website: text(selectors.website),
+        phone: text(selectors.phone),
+        reviews_label: reviews ? reviews.getAttribute("aria-label") || "" : "",
+        url: window.location.href,
+    };
+}
+"""
+
+
+def parse_rating(label: Optional[str]) -> Optional[float]:
+    """Return the leading number of a label such as ``"4,5 stars"``."""
+    if not label:
+        return None
+    try:
+        return float(label.split()[0].replace(",", "."))
+    except (IndexError, ValueError):
+        return None
+
+
+def parse_coordinates(url: str) -> tuple[Optional[float], Optional[float]]:
+    """Return the coordinates embedded in a Maps URL, if any.
+
+    Place links carry the listing's own position as ``!3d<lat>!4d<lon>``,
+    which is preferred over the ``@lat,lon`` viewport centre.
+    """
+    match = _PLACE_COORDS_RE.search(url or "") or _COORDS_RE.search(url or "")
+    if not match:
+        return None, None
+    return float(match.group(1)), float(match.group(2))
+
+
+def parse_place_id(url: str) -> Optional[str]:
+    """Return the stable feature ID (``0x…:0x…``) from a ``/maps/place`` URL."""
+    match = _PLACE_ID_RE.search(url or "")
+    return match.group(1).lower() if match else None
+
+
+@dataclass
+class ListingDetails:
+    """Fields read from a listing's detail panel."""
+
+    name: str = ""
+    address: str = ""
+    website: str = ""
+    phone: str = ""
+    reviews_average: Optional[float] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    url: str = ""
+    place_id: Optional[str] = None
+
+    def to_record(self, query: str) -> BusinessRecord:
+        return BusinessRecord(
+            name=self.name,
+            address=self.address,
+            website=self.website,
+            phone=self.phone,
+            reviews_average=self.reviews_average,
+            query=query,
+            latitude=self.latitude,
+            longitude=self.longitude,
+            place_id=self.place_id,
+        )
+
+
+class ListingExtractor:
+    """Read an open listing's detail panel with one ``page.evaluate`` call.
+
+    Subclass or pass different :class:`ListingSelectors` when Google changes
+    its markup; the scraper only depends on :meth:`extract`.
+    """
+
+    script = _EXTRACT_SCRIPT
+
+    def __init__(self, selectors: Optional[ListingSelectors] = None) -> None:
+        self.selectors = selectors or ListingSelectors()
+
+    async def extract(self, page: Page) -> ListingDetails:
+        raw = await page.evaluate(self.script, asdict(self.selectors))
+        return self.parse(raw or {})
+
+    def parse(self, raw: dict[str, Any]) -> ListingDetails:
+        url = raw.get("url") or ""
+        latitude, longitude = parse_coordinates(url)
+        return ListingDetails(
+            name=raw.get("name") or "",
+            address=raw.get("address") or "",
+            website=raw.get("website") or "",
+            phone=raw.get("phone") or "",
+            reviews_average=parse_rating(raw.get("reviews_label")),
+            latitude=latitude,
+            longitude=longitude,
+            url=url,
+            place_id=parse_place_id(url),
+        )
+
+
+DEFAULT_EXTRACTOR = ListingExtractor()
+
+
+@dataclass(frozen=True)
+class FeedSelectors:
+    """Selectors for the result cards in the scrolled search feed."""
+
+    anchor: str = "a[href^='https://www.google.com/maps/place']"
+    card: str = "div[role='article']"
+    name: str = ".qBF1Pd"
+    rating: str = "span[role='img']"
+    info_lines: str = ".W4Efsd"
+    website: str = "a[data-value='Website']"
+
+
+# Collects every result card in one call. Info lines are returned raw and
+# split in Python so the parsing rules can change without touching the page.
+_HARVEST_SCRIPT = """
+(selectors) => {
+    const anchors = Array.from(document.querySelectorAll(selectors.anchor));
+    return anchors.map((anchor, index) => {
+        const card = anchor.closest(selectors.card) || anchor.parentElement || anchor;
+        const nameEl = card.querySelector(selectors.name);
+        const ratingEl = card.querySelector(selectors.rating);
+        const websiteEl = card.querySelector(selectors.website);
+        const lines = Array.from(card.querySelectorAll(selectors.info_lines))
+            .filter((el) => !el.querySelector(selectors.info_lines))
+            .map((el) => (el.innerText || "").trim())
+            .filter((line) => line.length > 0);
+        return {
+            index: index,
+            url: anchor.href,
+            name: (anchor.getAttribute("aria-label") || (nameEl ? nameEl.innerText : "") || "").trim(),
+            rating_label: ratingEl ? ratingEl.getAttribute("aria-label") || "" : "",
+            website: websiteEl ? websiteEl.href || "" : "",
+            lines: lines,
+        };
+    });
+}
+"""
+
+
+@dataclass
+class FeedCard:
+    """A listing as shown in the result feed, before its panel is opened."""
+
+    index: int
+    name: str
+    url: str
+    reviews_average: Optional[float] = None
+    address: str = ""
+    phone: str = ""
+    website: str = ""
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    place_id: Optional[str] = None
+
+    def missing(self, fields: Sequence[str]) -> list[str]:
+        """Return the requested fields the card could not provide."""
+        return [name for name in fields if not getattr(self, name, None)]
+
+    def to_record(self, query: str) -> BusinessRecord:
+        return BusinessRecord(
+            name=self.name,
+            address=self.address,
+            website=self.website,
+            phone=self.phone,
+            reviews_average=self.reviews_average,
+            query=query,
+            latitude=self.latitude,
+            longitude=self.longitude,
+            place_id=self.place_id,
+        )
+
+
+class FeedExtractor:
+    """Read every result card in the feed with one ``page.evaluate`` call."""
+
+    script = _HARVEST_SCRIPT
+
+    def __init__(self, selectors: Optional[FeedSelectors] = None) -> None:
+        self.selectors = selectors or FeedSelectors()
+
+    async def harvest(self, page: Page) -> list[FeedCard]:
+        raw_cards = await page.evaluate(self.script, asdict(self.selectors))
+        return [card for card in (self.parse(raw) for raw in raw_cards or []) if card.name]
+
+    def parse(self, raw: dict[str, Any]) -> FeedCard:
+        url = raw.get("url") or ""
+        latitude, longitude = parse_coordinates(url)
+        card = FeedCard(
+            index=int(raw.get("index", 0)),
+            name=raw.get("name") or "",
+            url=url,
+            reviews_average=parse_rating(raw.get("rating_label")),
+            website=raw.get("website") or "",
+            latitude=latitude,
+            longitude=longitude,
+            place_id=parse_place_id(url),
+        )
+        described = False
+        for line in raw.get("lines") or []:
+            parts = [part.strip() for part in re.split(r"[·⋅]", line) if part.strip()]
+            if not parts or _RATING_LINE_RE.match(parts[0]):
+                continue
+            for part in parts:
+                if not card.phone and _PHONE_RE.match(part):
+                    card.phone = part
+            if not described:
+                # The first descriptive line reads "Category · Address".
+                described = True
+                if len(parts) > 1 and not _PHONE_RE.match(parts[-1]):
+                    card.address = parts[-1]
+        return card
+
+
+DEFAULT_FEED_EXTRACTOR = FeedExtractor()
@@ -0,0 +1,125 @@
+"""Drive the results feed from inside the page with a MutationObserver."""
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import Page
+
+from callbacks import notify
+
+SCROLL_REASONS = ("target", "end_of_list", "stalled", "no_feed", "timeout")
+
+
+@dataclass(frozen=True)
+class FeedScrollSelectors:
+    feed: str = "div[role='feed']"
+    anchor: str = "a[href^='https://www.google.com/maps/place']"
+    end_marker: str = "span.HlvSq"
+    end_text: str = "end of the list"
+
+
+# Scrolls the feed every time new cards render and resolves as soon as the
+# target count is reached, the end-of-list marker appears, the feed stops
+# growing for stall_ms, or the slice expires (so Python can send heartbeats).
+_SCROLL_SCRIPT = """
+async ([sel, target, sliceMs, stallMs, idleMs]) => {
+    const feed = document.querySelector(sel.feed);
+    const count = () => document.querySelectorAll(sel.anchor).length;
+    if (!feed) {
+        return {count: count(), reason: "no_feed", idle: 0};
+    }
+    const ended = (deep) => {
+        if (sel.end_marker && document.querySelector(sel.end_marker)) return true;
+        return deep && sel.end_text && (feed.innerText || "").includes(sel.end_text);
+    };
+    return await new Promise((resolve) => {
+        let last = count();
+        let lastGrowth = performance.now() - idleMs;
+        let done = false;
+        let observer = null;
+        let stallTimer = null;
+        let sliceTimer = null;
+        const finish = (reason) => {
+            if (done) return;
+            done = true;
+            if (observer) observer.disconnect();
+            clearInterval(stallTimer);
+            clearTimeout(sliceTimer);
+            resolve({count: count(), reason: reason, idle: performance.now() - lastGrowth});
+        };
+        const check = () => {
+            const current = count();
+            if (current > last) {
+                last = current;
+                lastGrowth = performance.now();
+            }
+            if (current >= target) return finish("target");
+            if (ended(false)) return finish("end_of_list");
+            feed.scrollTop = feed.scrollHeight;
+        };
+        observer = new MutationObserver(check);
+        observer.observe(feed, {childList: true, subtree: true});
+        stallTimer = setInterval(() => {
+            if (ended(true)) return finish("end_of_list");
+            if (performance.now() - lastGrowth > stallMs) return finish("stalled");
+            feed.scrollTop = feed.scrollHeight;
+        }, 250);
+        sliceTimer = setTimeout(() => finish("slice"), sliceMs);
+        check();
+    });
+}
+"""
+
+
+@dataclass
+class ScrollOutcome:
+    """How a feed scroll ended; ``reason`` is one of :data:`SCROLL_REASONS`."""
+
+    count: int
+    reason: str
+    elapsed_ms: float
+
+
+class FeedScroller:
+    """Load up to ``target`` results with as few round-trips as possible."""
+
+    script = _SCROLL_SCRIPT
+
+    def __init__(
+        self,
+        selectors: Optional[FeedScrollSelectors] = None,
+        *,
+        slice_ms: int = 5000,
+        stall_ms: int = 3000,
+        max_ms: int = 60000,
+    ) -> None:
+        self.selectors = selectors or FeedScrollSelectors()
+        self.slice_ms = slice_ms
+        self.stall_ms = stall_ms
+        self.max_ms = max_ms
+
+    async def scroll(
+        self,
+        page: Page,
+        target: int,
+        *,
+        heartbeat: Optional[Callable[[], Optional[Awaitable[None]]]] = None,
+    ) -> ScrollOutcome:
+        started = time.perf_counter()
+        idle = 0.0
+        while True:
+            raw = await page.evaluate(
+                self.script,
+                [asdict(self.selectors), target, self.slice_ms, self.stall_ms, idle],
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            count = int(raw.get("count", 0))
+            reason = raw.get("reason", "stalled")
+            if reason != "slice":
+                return ScrollOutcome(count, reason, elapsed_ms)
+            if elapsed_ms >= self.max_ms:
+                return ScrollOutcome(count, "timeout", elapsed_ms)
+            idle = float(raw.get("idle", 0.0))
+            await notify(heartbeat)
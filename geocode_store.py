@@ -0,0 +1,102 @@
+"""Persistent city → coordinate cache shared by every worker and run."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+DEFAULT_CACHE_DB = "mapmonkey_cache.db"
+
+
+def default_cache_path(state_file: str) -> str:
+    """Place the cache database next to ``run_state.json``."""
+    return str(Path(state_file).resolve().parent / DEFAULT_CACHE_DB)
+
+
+class GeocodeStore:
+    """Keep geocoded city centres in a small SQLite table.
+
+    Lookups are served from memory after the first hit; writes go straight
+    to disk so other processes and later runs see them.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._memory: dict[str, tuple[float, float]] = {}
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA busy_timeout=30000;")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocode (
+                city TEXT PRIMARY KEY,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                source TEXT,
+                updated_at REAL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, city: str) -> Optional[tuple[float, float]]:
+        with self._lock:
+            cached = self._memory.get(city)
+            if cached:
+                return cached
+            row = self.conn.execute(
+                "SELECT latitude, longitude FROM geocode WHERE city = ?",
+                (city,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._memory[city] = (row[0], row[1])
+            return self._memory[city]
+
+    def put(self, city: str, latitude: float, longitude: float, *, source: str = "maps") -> None:
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO geocode (city, latitude, longitude, source, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(city) DO UPDATE SET
+                    latitude=excluded.latitude,
+                    longitude=excluded.longitude,
+                    source=excluded.source,
+                    updated_at=excluded.updated_at
+                """,
+                (city, latitude, longitude, source, time.time()),
+            )
+            self.conn.commit()
+            self._memory[city] = (latitude, longitude)
+
+    def seed(self, rows: Iterable[tuple[str, float, float]], *, source: str = "csv") -> int:
+        """Bulk load known coordinates; explicit values replace geocoded ones."""
+        now = time.time()
+        values = [(city, lat, lon, source, now) for city, lat, lon in rows]
+        if not values:
+            return 0
+        with self._lock:
+            self.conn.executemany(
+                """
+                INSERT INTO geocode (city, latitude, longitude, source, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(city) DO UPDATE SET
+                    latitude=excluded.latitude,
+                    longitude=excluded.longitude,
+                    source=excluded.source,
+                    updated_at=excluded.updated_at
+                """,
+                values,
+            )
+            self.conn.commit()
+            for city, lat, lon, _, _ in values:
+                self._memory[city] = (lat, lon)
+        return len(values)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
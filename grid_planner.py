@@ -0,0 +1,158 @@
+"""Decide which map cells a city search visits."""
+from __future__ import annotations
+
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+DEFAULT_ZOOM = 15
+
+
+@dataclass(frozen=True)
+class GridCell:
+    """A square search area centred on ``lat``/``lon``."""
+
+    lat: float
+    lon: float
+    spacing: float
+    zoom: int = DEFAULT_ZOOM
+    depth: int = 0
+    i: int = 0
+    j: int = 0
+
+    def children(self) -> list["GridCell"]:
+        """Split the cell into four quadrants one zoom level closer."""
+        quarter = self.spacing / 4
+        return [
+            GridCell(
+                lat=self.lat + di * quarter,
+                lon=self.lon + dj * quarter,
+                spacing=self.spacing / 2,
+                zoom=self.zoom + 1,
+                depth=self.depth + 1,
+                i=2 * self.i + (di > 0),
+                j=2 * self.j + (dj > 0),
+            )
+            for di in (-1, 1)
+            for dj in (-1, 1)
+        ]
+
+    def neighbours(self) -> list[tuple[int, int, int]]:
+        return [
+            (self.depth, self.i + di, self.j + dj)
+            for di in (-1, 0, 1)
+            for dj in (-1, 0, 1)
+            if di or dj
+        ]
+
+    def as_context(self) -> Dict[str, Any]:
+        return {"i": self.i, "j": self.j, "depth": self.depth, "zoom": self.zoom}
+
+
+def _initial_cells(
+    lat: float,
+    lon: float,
+    steps: int,
+    spacing: float,
+    zoom: int,
+    rng: random.Random,
+) -> list[GridCell]:
+    cells = [
+        GridCell(lat + i * spacing, lon + j * spacing, spacing, zoom, 0, i, j)
+        for i in range(-steps, steps + 1)
+        for j in range(-steps, steps + 1)
+    ]
+    rng.shuffle(cells)
+    return cells
+
+
+class UniformPlanner:
+    """The fixed ``(2*steps+1)^2`` grid, visited in random order."""
+
+    def __init__(
+        self,
+        lat: float,
+        lon: float,
+        steps: int,
+        spacing: float,
+        *,
+        zoom: int = DEFAULT_ZOOM,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self._pending = deque(_initial_cells(lat, lon, steps, spacing, zoom, rng or random.Random()))
+
+    def next_cell(self) -> Optional[GridCell]:
+        return self._pending.popleft() if self._pending else None
+
+    def record(self, cell: GridCell, found: int, saved: int, total: int) -> None:
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._pending)}
+
+
+class QuadtreePlanner:
+    """Refine busy cells and skip the surroundings of empty ones.
+
+    A cell whose search returned ``total`` results was probably truncated, so
+    its four quadrants are queued at the next zoom level (up to ``max_depth``).
+    A cell that found no results counts against each neighbour at the same
+    depth; a pending neighbour is pruned once ``prune_after`` of its
+    neighbours came back empty. ``max_cells`` caps the cells scraped per city.
+    """
+
+    def __init__(
+        self,
+        lat: float,
+        lon: float,
+        steps: int,
+        spacing: float,
+        *,
+        zoom: int = DEFAULT_ZOOM,
+        max_depth: int = 2,
+        max_cells: int = 100,
+        prune_after: int = 1,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.max_depth = max_depth
+        self.max_cells = max_cells
+        self.prune_after = prune_after
+        self._pending = deque(_initial_cells(lat, lon, steps, spacing, zoom, rng or random.Random()))
+        self._barren_neighbours: Dict[tuple[int, int, int], int] = {}
+        self.scraped = 0
+        self.splits = 0
+        self.pruned = 0
+
+    def next_cell(self) -> Optional[GridCell]:
+        while self._pending and self.scraped < self.max_cells:
+            cell = self._pending.popleft()
+            if self.prune_after > 0 and (
+                self._barren_neighbours.get((cell.depth, cell.i, cell.j), 0) >= self.prune_after
+            ):
+                self.pruned += 1
+                continue
+            self.scraped += 1
+            return cell
+        return None
+
+    def record(self, cell: GridCell, found: int, saved: int, total: int) -> None:
+        if found >= total and cell.depth < self.max_depth:
+            # Children go to the front so a dense area is finished before
+            # the planner moves on.
+            self._pending.extendleft(reversed(cell.children()))
+            self.splits += 1
+            return
+        # Only a search with no results at all marks the area as empty; a
+        # cell whose results were all stored already is not barren.
+        if found == 0:
+            for key in cell.neighbours():
+                self._barren_neighbours[key] = self._barren_neighbours.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "scraped": self.scraped,
+            "splits": self.splits,
+            "pruned": self.pruned,
+        }
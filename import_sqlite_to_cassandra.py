@@ -1,19 +1,162 @@
-import sqlite3
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from db import init_db, save_business, close_db
 
+from db import close_db, connect_sqlite_readonly, init_db, save_business_batch
 
-def import_sqlite_files(directory: Path) -> None:
-    cassandra_conn = init_db(None, storage="cassandra")
-    for db_path in directory.glob("*.db"):
-        sqlite_conn = sqlite3.connect(db_path)
-        cur = sqlite_conn.execute(
-            "SELECT name, address, website, phone, reviews_average, query, latitude, longitude FROM businesses"
-        )
-        for row in cur:
-            save_business(cassandra_conn, row, storage="cassandra")
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = "import_checkpoint.json"
+
+
+class ImportCheckpoint:
+    """Last imported rowid per source file, saved after every chunk.
+
+    A chunk is recorded only once Cassandra has accepted all of it, so an
+    interrupted import resumes after the last complete chunk. Re-sending a
+    chunk is harmless because Cassandra inserts are upserts.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self.state = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.state = {}
+
+    def last_rowid(self, source: Path) -> int:
+        with self._lock:
+            return int(self.state.get(str(source.resolve()), {}).get("rowid", 0))
+
+    def update(self, source: Path, rowid: int, rows: int) -> None:
+        with self._lock:
+            entry = self.state.setdefault(str(source.resolve()), {"rowid": 0, "rows": 0})
+            entry["rowid"] = rowid
+            entry["rows"] += rows
+            entry["updated_at"] = time.time()
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+class ImportProgress:
+    """Rows imported so far, for rows/sec reporting across all files."""
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, rows: int) -> tuple[int, float]:
+        with self._lock:
+            self.rows += rows
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            return self.rows, self.rows / elapsed
+
+
+def import_sqlite_file(
+    session,
+    db_path: Path,
+    checkpoint: ImportCheckpoint,
+    progress: ImportProgress,
+    *,
+    chunk_size: int = 5000,
+) -> int:
+    """Copy ``db_path`` into Cassandra in rowid order, resuming at the checkpoint."""
+    since = checkpoint.last_rowid(db_path)
+    if since:
+        logger.info("%s: resuming after rowid %d", db_path.name, since)
+    sqlite_conn = connect_sqlite_readonly(str(db_path))
+    imported = 0
+    started = time.monotonic()
+    try:
+        while True:
+            chunk = sqlite_conn.execute(
+                """
+                SELECT rowid, name, address, website, phone, reviews_average, query, latitude, longitude
+                FROM businesses
+                WHERE rowid > ?
+                ORDER BY rowid
+                LIMIT ?
+                """,
+                (since, chunk_size),
+            ).fetchall()
+            if not chunk:
+                break
+            # Inserts within the chunk run concurrently (CASSANDRA_WRITE_CONCURRENCY).
+            save_business_batch(session, [row[1:] for row in chunk], storage="cassandra")
+            since = chunk[-1][0]
+            checkpoint.update(db_path, since, len(chunk))
+            imported += len(chunk)
+            total, total_rate = progress.add(len(chunk))
+            rate = imported / max(time.monotonic() - started, 1e-9)
+            logger.info(
+                "%s: %d rows (%.0f rows/s); all files: %d rows (%.0f rows/s)",
+                db_path.name,
+                imported,
+                rate,
+                total,
+                total_rate,
+            )
+    finally:
         sqlite_conn.close()
-    close_db(cassandra_conn, storage="cassandra")
+    return imported
+
+
+def import_sqlite_files(
+    directory: Path,
+    *,
+    workers: int = 4,
+    chunk_size: int = 5000,
+    checkpoint_path: Path | None = None,
+) -> int:
+    """Import every ``*.db`` file in ``directory``, ``workers`` files at a time."""
+    checkpoint = ImportCheckpoint(checkpoint_path or directory / DEFAULT_CHECKPOINT)
+    progress = ImportProgress()
+    sources = sorted(directory.glob("*.db"))
+    cassandra_conn = init_db(None, storage="cassandra")
+    failed = []
+    try:
+        # The driver's session is thread-safe, so the files share it.
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="import") as pool:
+            futures = {
+                pool.submit(
+                    import_sqlite_file,
+                    cassandra_conn,
+                    db_path,
+                    checkpoint,
+                    progress,
+                    chunk_size=chunk_size,
+                ): db_path
+                for db_path in sources
+            }
+            for future in as_completed(futures):
+                db_path = futures[future]
+                try:
+                    rows = future.result()
+                except Exception:
+                    failed.append(db_path)
+                    logger.exception("%s: import stopped; rerun to resume from the checkpoint", db_path.name)
+                else:
+                    logger.info("%s: done, %d rows imported", db_path.name, rows)
+    finally:
+        close_db(cassandra_conn, storage="cassandra")
+    elapsed = max(time.monotonic() - progress.started, 1e-9)
+    logger.info(
+        "Imported %d rows from %d files in %.1fs (%.0f rows/s)",
+        progress.rows,
+        len(sources) - len(failed),
+        elapsed,
+        progress.rows / elapsed,
+    )
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(sources)} files did not finish: {', '.join(p.name for p in failed)}")
+    return progress.rows
 
 
 if __name__ == "__main__":
@@ -25,8 +168,23 @@ if __name__ == "__main__":
     parser.add_argument(
         "path", nargs="?", default=".", help="Folder to search for SQLite files"
     )
+    parser.add_argument("--workers", type=int, default=4, help="Files imported in parallel")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows read and written per chunk")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help=f"Progress file (default: {DEFAULT_CHECKPOINT} in the folder)",
+    )
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and import everything")
     args = parser.parse_args()
-    import_sqlite_files(Path(args.path))
-
-
-
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    folder = Path(args.path)
+    checkpoint_file = args.checkpoint or folder / DEFAULT_CHECKPOINT
+    if args.restart and checkpoint_file.exists():
+        checkpoint_file.unlink()
+    import_sqlite_files(
+        folder,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint_path=checkpoint_file,
+    )
@@ -10,12 +10,14 @@ from typing import Any, Dict, Optional
 from urllib.parse import parse_qs, urlparse
 
 from db import (
+    connect_sqlite_readonly,
     count_businesses,
     fetch_recent_businesses,
     get_dsn,
     get_storage,
     init_db,
 )
+from parquet_store import ParquetStore
 
 
 class DashboardDataSource:
@@ -25,11 +27,17 @@ class DashboardDataSource:
         self._lock = threading.Lock()
         self._conn = None
         self._cache: Dict[str, Dict[str, Any]] = {}
-        if self.storage != "csv":
-            try:
+        try:
+            if self.storage == "sqlite":
+                # Read-only, so the dashboard never competes with the writer.
+                self._conn = connect_sqlite_readonly(self.dsn)
+            elif self.storage == "parquet":
+                # Reads the manifest only; buffered rows are counted too.
+                self._conn = ParquetStore(self.dsn, readonly=True)
+            elif self.storage != "csv":
                 self._conn = init_db(self.dsn, storage=self.storage)
-            except Exception:
-                self._conn = None
+        except Exception:
+            self._conn = None
 
     def _cache_get(self, key: str, ttl: float) -> Optional[Any]:
         entry = self._cache.get(key)
@@ -44,17 +52,14 @@ class DashboardDataSource:
 
     def get_total(self) -> Optional[int]:
         with self._lock:
-            cached = self._cache_get("total", 5.0)
+            # Cassandra counts with a full token-range scan, so refresh rarely.
+            cached = self._cache_get("total", 300.0 if self.storage == "cassandra" else 5.0)
             if cached is not None:
                 return cached
             total = None
             if self.storage == "csv":
-                path = Path(self.dsn)
-                if path.exists():
-                    with path.open() as f:
-                        total = max(sum(1 for _ in f) - 1, 0)
-                else:
-                    total = 0
+                # Counted from the writer's sidecar, not by reading the file.
+                total = count_businesses(Path(self.dsn), storage=self.storage)
             elif self._conn is not None:
                 total = count_businesses(self._conn, storage=self.storage)
             self._cache_set("total", total)
@@ -0,0 +1,254 @@
+"""Decode the listing data Google Maps sends in its own search responses.
+
+Scrolling the result feed makes the page fetch more results from
+``/search?tbm=map``. :class:`SearchResponseCollector` listens for those
+responses and turns them into :class:`BusinessRecord` objects, so no listing
+has to be clicked or located in the DOM.
+
+Every ``fixtures/maps_search_response.*.txt`` body has an ``.expected.json``
+sidecar with the name, address and place ID of each listing it carries, and
+``tests/test_network_capture.py`` checks the parser against all of them. To
+add a recorded response, scrape with ``--record-responses``, copy a body into
+``fixtures/`` under that name, then write and review its sidecar::
+
+    python network_capture.py fixtures/maps_search_response.<label>.txt --write-expected
+
+``maps_search_response.synthetic.txt`` is hand-written in the shape of
+:data:`DEFAULT_LAYOUT`; it checks the decoding plumbing, not that the layout
+still matches what Google serves.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+from urllib.parse import urlparse
+
+from storage_manager import BusinessRecord
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from playwright.async_api import Page, Response
+
+logger = logging.getLogger(__name__)
+
+_XSSI_PREFIX = ")]}'"
+_TRAILER = '/*""*/'
+
+
+@dataclass(frozen=True)
+class PayloadLayout:
+    """Index paths of each field inside a search payload.
+
+    Google ships these responses as positional arrays. Keeping the paths in
+    one place means a layout change is a one-line fix.
+    """
+
+    results: tuple[int, ...] = (0, 1)
+    place: tuple[int, ...] = (14,)
+    name: tuple[int, ...] = (11,)
+    address: tuple[int, ...] = (39,)
+    address_lines: tuple[int, ...] = (2,)
+    website: tuple[int, ...] = (7, 0)
+    phone: tuple[int, ...] = (178, 0, 0)
+    rating: tuple[int, ...] = (4, 7)
+    latitude: tuple[int, ...] = (9, 2)
+    longitude: tuple[int, ...] = (9, 3)
+    place_id: tuple[int, ...] = (10,)
+
+
+DEFAULT_LAYOUT = PayloadLayout()
+
+
+def _dig(data: Any, path: Sequence[int]) -> Any:
+    for index in path:
+        if not isinstance(data, list) or index >= len(data):
+            return None
+        data = data[index]
+    return data
+
+
+def is_search_response(url: str) -> bool:
+    """Return True for the XHR the feed uses to load search results."""
+    parsed = urlparse(url)
+    return parsed.path == "/search" and "tbm=map" in parsed.query
+
+
+def decode_payload(body: str) -> Any:
+    """Strip the JSON wrapper and XSSI guard and return the decoded array."""
+    text = body.strip()
+    if text.endswith(_TRAILER):
+        text = text[: -len(_TRAILER)].rstrip()
+    if text.startswith("{"):
+        text = json.loads(text).get("d", "")
+    if text.startswith(_XSSI_PREFIX):
+        text = text[len(_XSSI_PREFIX):]
+    return json.loads(text)
+
+
+def parse_search_payload(
+    body: str,
+    query: str,
+    *,
+    layout: PayloadLayout = DEFAULT_LAYOUT,
+) -> list[BusinessRecord]:
+    """Return the listings carried by one search response body."""
+    data = decode_payload(body)
+    records: list[BusinessRecord] = []
+    for entry in _dig(data, layout.results) or []:
+        place = _dig(entry, layout.place)
+        if not isinstance(place, list):
+            continue
+        name = _dig(place, layout.name)
+        if not name:
+            continue
+        address = _dig(place, layout.address)
+        if not address:
+            lines = _dig(place, layout.address_lines) or []
+            address = ", ".join(line for line in lines if isinstance(line, str))
+        rating = _dig(place, layout.rating)
+        latitude = _dig(place, layout.latitude)
+        longitude = _dig(place, layout.longitude)
+        place_id = _dig(place, layout.place_id)
+        records.append(
+            BusinessRecord(
+                name=str(name),
+                address=str(address or ""),
+                website=str(_dig(place, layout.website) or ""),
+                phone=str(_dig(place, layout.phone) or ""),
+                reviews_average=float(rating) if isinstance(rating, (int, float)) else None,
+                query=query,
+                latitude=float(latitude) if isinstance(latitude, (int, float)) else None,
+                longitude=float(longitude) if isinstance(longitude, (int, float)) else None,
+                place_id=str(place_id).lower() if place_id else None,
+            )
+        )
+    return records
+
+
+class SearchResponseCollector:
+    """Gather listings from the page's search responses while it scrolls."""
+
+    def __init__(
+        self,
+        query: str,
+        *,
+        layout: PayloadLayout = DEFAULT_LAYOUT,
+        record_dir: Optional[Path] = None,
+    ) -> None:
+        self.query = query
+        self.layout = layout
+        self.record_dir = Path(record_dir) if record_dir else None
+        self.records: list[BusinessRecord] = []
+        self.responses = 0
+        self.errors = 0
+        self._keys: set[tuple[str, str]] = set()
+        self._page: Optional["Page"] = None
+
+    def attach(self, page: "Page") -> None:
+        self._page = page
+        page.on("response", self._on_response)
+
+    def detach(self) -> None:
+        if self._page is not None:
+            self._page.remove_listener("response", self._on_response)
+            self._page = None
+
+    def take(self, limit: int) -> list[BusinessRecord]:
+        return self.records[:limit]
+
+    async def _on_response(self, response: "Response") -> None:
+        if not is_search_response(response.url):
+            return
+        try:
+            body = await response.text()
+        except Exception:  # noqa: BLE001 - the page may have navigated away
+            self.errors += 1
+            return
+        self.responses += 1
+        if self.record_dir is not None:
+            self._record(body)
+        try:
+            records = parse_search_payload(body, self.query, layout=self.layout)
+        except (ValueError, TypeError) as exc:
+            self.errors += 1
+            logger.debug("Could not decode search payload: %s", exc)
+            return
+        for record in records:
+            key = (record.name.strip().lower(), record.address.strip().lower())
+            if key in self._keys:
+                continue
+            self._keys.add(key)
+            self.records.append(record)
+
+    def _record(self, body: str) -> None:
+        self.record_dir.mkdir(parents=True, exist_ok=True)
+        path = self.record_dir / f"search-{time.time_ns()}.txt"
+        path.write_text(body, encoding="utf-8")
+
+
+# Fields a fixture's ``.expected.json`` pins down for every listing.
+EXPECTED_FIELDS = ("name", "address", "place_id")
+
+
+def expected_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.expected.json")
+
+
+def expected_listings(records: Sequence[BusinessRecord]) -> list[dict[str, Any]]:
+    return [{field: getattr(record, field) for field in EXPECTED_FIELDS} for record in records]
+
+
+def compare_expected(records: Sequence[BusinessRecord], expected: Sequence[dict[str, Any]]) -> list[str]:
+    """Return one message per listing that differs from ``expected``."""
+    actual = expected_listings(records)
+    problems = [
+        f"listing {i}: expected {want}, got {got}"
+        for i, (want, got) in enumerate(zip(expected, actual))
+        if want != got
+    ]
+    if len(actual) != len(expected):
+        problems.append(f"expected {len(expected)} listings, got {len(actual)}")
+    return problems
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse saved Maps search responses offline")
+    parser.add_argument("paths", nargs="+", type=Path, help="Recorded response bodies")
+    parser.add_argument("--query", default="", help="Query to stamp on parsed records")
+    parser.add_argument(
+        "--write-expected",
+        action="store_true",
+        help="Save what each file yields as its .expected.json instead of checking it",
+    )
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in args.paths:
+        records = parse_search_payload(path.read_text(encoding="utf-8"), args.query)
+        print(f"{path}: {len(records)} listings")
+        for record in records:
+            print("  " + json.dumps(record.as_dict(), ensure_ascii=False))
+        sidecar = expected_path(path)
+        if args.write_expected:
+            sidecar.write_text(
+                json.dumps(expected_listings(records), indent=2, ensure_ascii=False) + "\n",
+                encoding="utf-8",
+            )
+            print(f"  wrote {sidecar}")
+        elif sidecar.exists():
+            problems = compare_expected(records, json.loads(sidecar.read_text(encoding="utf-8")))
+            for problem in problems:
+                print(f"  MISMATCH {problem}")
+            failures += bool(problems)
+        if not records:
+            failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ import random
 import time
 from contextlib import suppress
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any, Optional
 
 from playwright.async_api import async_playwright
@@ -40,11 +41,20 @@ except ImportError:  # pragma: no cover - optional dependency
             "Prometheus metrics requested but prometheus_client is not installed."
         )
 
-from db import get_dsn
+from browser_pool import BrowserPool
+from db import get_dsn, get_storage
+from coverage_index import COVERAGE_MODES, open_coverage
+from dedupe_index import DedupeIndex
+from geocode_store import GeocodeStore, default_cache_path
 from obfuscation import BrowserIdentity, create_identity_pool
+from persistence import PersistencePipeline
+from place_index import PlaceIndex
+from rate_governor import RateGovernor
+from routing import RequestBlockPolicy
 from scraper import scrape_city_grid
 from state_manager import StateManager, load_state
 from storage_manager import BusinessStore
+from waits import WaitEngine, parse_timeouts
 
 
 TERMS_PROCESSED = Counter(
@@ -59,6 +69,33 @@ ACTIVE_WORKERS = Gauge(
     "mapmonkey_active_workers",
     "Number of workers actively scraping",
 )
+SEARCH_RATE = Gauge(
+    "mapmonkey_search_rate_per_minute",
+    "Cells per minute currently allowed by the rate governor",
+)
+RATE_BACKOFFS = Counter(
+    "mapmonkey_rate_backoffs_total",
+    "Number of times the rate governor backed off after a throttling signal",
+)
+BLOCKED_REQUESTS = Counter(
+    "mapmonkey_blocked_requests_total",
+    "Number of browser requests aborted by the block policy",
+)
+BLOCKED_BYTES = Counter(
+    "mapmonkey_blocked_bytes_estimated_total",
+    "Estimated bytes saved by aborting blocked requests",
+)
+
+
+def _governor_changed(governor: RateGovernor, reason: Optional[str]) -> None:
+    SEARCH_RATE.set(governor.rate)
+    if reason is not None:
+        RATE_BACKOFFS.inc()
+
+
+def _count_blocked(resource_type: str, size: int) -> None:
+    BLOCKED_REQUESTS.inc()
+    BLOCKED_BYTES.inc(size)
 
 
 def load_list(path: str) -> list[str]:
@@ -72,12 +109,44 @@ def load_list(path: str) -> list[str]:
         ]
 
 
+_LATITUDE_COLUMNS = {"lat", "latitude"}
+_LONGITUDE_COLUMNS = {"lon", "lng", "long", "longitude"}
+
+
+def load_cities(path: str) -> tuple[list[str], list[tuple[str, float, float]]]:
+    """Return city names plus any coordinates given in lat/lon columns."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = [column.strip().lower() for column in next(reader, [])]
+        lat_idx = next((i for i, col in enumerate(header) if col in _LATITUDE_COLUMNS), None)
+        lon_idx = next((i for i, col in enumerate(header) if col in _LONGITUDE_COLUMNS), None)
+        coord_columns = {i for i in (lat_idx, lon_idx) if i is not None}
+
+        cities: list[str] = []
+        seeds: list[tuple[str, float, float]] = []
+        for row in reader:
+            name = ", ".join(
+                part.strip() for i, part in enumerate(row) if i not in coord_columns and part.strip()
+            )
+            if not name:
+                continue
+            cities.append(name)
+            if lat_idx is None or lon_idx is None:
+                continue
+            try:
+                seeds.append((name, float(row[lat_idx]), float(row[lon_idx])))
+            except (IndexError, ValueError):
+                continue
+        return cities, seeds
+
+
 @dataclass
 class WorkerSlot:
     browser: Any
     context: Any
     page: Any
     task: Optional[asyncio.Task] = None
+    writer: Optional[PersistencePipeline] = None
     current_term: Optional[str] = None
     last_heartbeat: float = field(default_factory=time.monotonic)
 
@@ -89,6 +158,11 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
     ]
 
     async with async_playwright() as p:
+        pool = BrowserPool(
+            p,
+            contexts_per_browser=args.contexts_per_browser,
+            headless=args.headless,
+        )
         queue: asyncio.Queue[str] = asyncio.Queue()
         start_index = state_mgr.state.get("term_index", 0)
         for term in terms[start_index:]:
@@ -100,7 +174,10 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
 
         async def worker(worker_id: int, slot: WorkerSlot) -> None:
             page = slot.page
-            store = BusinessStore(args.dsn)
+            store = BusinessStore(args.dsn, place_index=args.place_index, dedupe=args.dedupe)
+            writer = PersistencePipeline(store, max_pending=args.write_queue)
+            slot.writer = writer
+            waits = WaitEngine(args.wait_timeouts)
             try:
                 while True:
                     try:
@@ -158,6 +235,19 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
                             heartbeat_cb=on_heartbeat,
                             event_cb=on_event,
                             business_cb=on_business,
+                            mode=args.harvest_mode,
+                            detail_fields=args.detail_fields,
+                            record_dir=args.record_responses,
+                            waits=waits,
+                            geocode_store=args.geocode_store,
+                            planner=args.planner,
+                            max_depth=args.max_depth,
+                            max_cells=args.max_cells,
+                            prune_after=args.prune_after,
+                            coverage=args.coverage,
+                            coverage_mode=args.coverage_mode,
+                            governor=args.governor,
+                            writer=writer,
                         )
                         term_completed = True
                     except asyncio.CancelledError:
@@ -168,6 +258,7 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
                     finally:
                         await state_mgr.clear_batch(worker_id)
                         await state_mgr.clear_worker(worker_id)
+                        await state_mgr.record_wait_stats(worker_id, waits.snapshot())
                         if term_completed:
                             await state_mgr.increment_term()
                             TERMS_PROCESSED.inc()
@@ -176,6 +267,9 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
                         slot.last_heartbeat = time.monotonic()
 
             finally:
+                # Batches still queued when a worker is cancelled are written
+                # before the store goes away.
+                await writer.close()
                 store.close()
 
         async def start_worker(worker_id: int, *, reason: Optional[str] = None) -> None:
@@ -193,24 +287,18 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
                     offset_y = args.identity_rng.randint(0, 300)
                     launch_args.append(f"--window-position={offset_x},{offset_y}")
 
-            browser = await p.chromium.launch(headless=args.headless, args=launch_args)
-            context_kwargs = identity.to_context_kwargs() if identity else {}
-            context = await browser.new_context(**context_kwargs)
-            if identity:
-                await context.add_init_script(identity.init_script())
-            page = await context.new_page()
+            lease = await pool.lease(identity, launch_args=launch_args)
+            if args.block_policy is not None:
+                await args.block_policy.install(lease.context)
 
-            slot = WorkerSlot(browser=browser, context=context, page=page)
+            slot = WorkerSlot(browser=lease.browser, context=lease.context, page=lease.page)
             worker_slots[worker_id] = slot
 
             async def run_worker() -> None:
                 try:
                     await worker(worker_id, slot)
                 finally:
-                    with suppress(Exception):
-                        await context.close()
-                    with suppress(Exception):
-                        await browser.close()
+                    await pool.release(lease)
                     if worker_slots.get(worker_id) is slot:
                         worker_slots.pop(worker_id, None)
 
@@ -272,6 +360,19 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
                         elapsed = now - slot.last_heartbeat
                         await restart_worker(worker_id, f"no heartbeat for {elapsed:.1f}s")
 
+                if args.block_policy is not None:
+                    await state_mgr.set_metric("blocked_requests", args.block_policy.stats.as_dict())
+                if args.governor is not None:
+                    await state_mgr.set_metric("governor", args.governor.snapshot())
+                await state_mgr.set_metric(
+                    "persistence",
+                    {
+                        str(worker_id): slot.writer.snapshot()
+                        for worker_id, slot in worker_slots.items()
+                        if slot.writer is not None
+                    },
+                )
+
                 await asyncio.sleep(interval)
 
         monitor_task: Optional[asyncio.Task] = None
@@ -297,11 +398,35 @@ async def run_city(city: str, terms: list[str], state_mgr: StateManager, args) -
                 with suppress(asyncio.CancelledError):
                     await task
 
+            await pool.close()
+
 
 async def main(args) -> None:
     args.dsn = get_dsn(args.dsn)
-    cities = load_list(args.cities_file)
+    cities, city_coords = load_cities(args.cities_file)
     terms = load_list(args.terms_file)
+    cache_db = args.cache_db or default_cache_path(args.state_file)
+    args.geocode_store = GeocodeStore(cache_db)
+    args.place_index = PlaceIndex(cache_db)
+    # Filled by the first worker's store and shared by every later one.
+    args.dedupe = DedupeIndex.for_storage(
+        get_storage(),
+        bloom_bits_per_key=args.dedupe_bloom_bits,
+        preload_keys=args.preload_keys,
+    )
+    args.governor = None
+    if args.cooldown == "governor":
+        args.governor = RateGovernor(
+            rate=args.start_rate,
+            min_rate=args.min_rate,
+            max_rate=args.max_rate,
+            on_change=_governor_changed,
+        )
+        SEARCH_RATE.set(args.governor.rate)
+    args.coverage = open_coverage(
+        cache_db, args.coverage_mode, max_age=args.coverage_max_age * 3600
+    )
+    seeded = args.geocode_store.seed(city_coords)
 
     state = load_state(args.state_file)
     state["total_cities"] = len(cities)
@@ -313,16 +438,43 @@ async def main(args) -> None:
 
     state_mgr = StateManager(args.state_file, state, flush_interval=args.flush_interval)
     await state_mgr.flush(force=True)
+    if seeded:
+        await state_mgr.record_event("info", f"Seeded {seeded} city coordinates from {args.cities_file}")
 
-    for idx in range(state.get("city_index", 0), len(cities)):
-        city = cities[idx]
-        await state_mgr.start_city(idx, city)
-        try:
-            await run_city(city, terms, state_mgr, args)
-        except Exception as exc:  # noqa: BLE001
-            await state_mgr.record_event("error", f"Error processing city '{city}': {exc}")
-            break
-        await state_mgr.next_city(idx + 1)
+    try:
+        for idx in range(state.get("city_index", 0), len(cities)):
+            city = cities[idx]
+            await state_mgr.start_city(idx, city)
+            try:
+                await run_city(city, terms, state_mgr, args)
+            except Exception as exc:  # noqa: BLE001
+                await state_mgr.record_event("error", f"Error processing city '{city}': {exc}")
+                break
+            await state_mgr.next_city(idx + 1)
+    finally:
+        args.geocode_store.close()
+        args.place_index.close()
+        args.dedupe.close()
+        if args.governor is not None:
+            await state_mgr.set_metric("governor", args.governor.snapshot())
+            await state_mgr.flush(force=True)
+        if args.coverage is not None:
+            args.coverage.close()
+
+
+def _parse_detail_fields(value: str) -> tuple[str, ...]:
+    fields = tuple(part.strip().lower() for part in value.split(",") if part.strip())
+    unknown = set(fields) - {"phone", "website", "address"}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown detail fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def _parse_wait_timeouts(value: str) -> dict[str, int]:
+    try:
+        return parse_timeouts(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
 
 
 def parse_args() -> argparse.Namespace:
@@ -334,18 +486,118 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--steps", type=int, default=0)
     parser.add_argument("--spacing-deg", type=float, default=0.02)
     parser.add_argument("--per-grid-total", type=int, default=50)
+    parser.add_argument(
+        "--planner",
+        choices=["uniform", "adaptive"],
+        default="uniform",
+        help="Scrape the fixed grid (uniform) or split busy cells and prune empty areas (adaptive)",
+    )
+    parser.add_argument("--max-depth", type=int, default=2, help="Adaptive planner: maximum cell splits")
+    parser.add_argument("--max-cells", type=int, default=100, help="Adaptive planner: cell budget per city and term")
+    parser.add_argument(
+        "--prune-after",
+        type=int,
+        default=1,
+        help="Adaptive planner: skip a cell once this many neighbours returned no results (0 disables)",
+    )
     parser.add_argument("--dsn", help="Database DSN or path")
     parser.add_argument("--screen-width", type=int, default=1920)
     parser.add_argument("--screen-height", type=int, default=1080)
-    parser.add_argument("--store", choices=["postgres", "cassandra", "sqlite", "csv"], help="Storage backend")
+    parser.add_argument("--store", choices=["postgres", "cassandra", "sqlite", "csv", "parquet"], help="Storage backend")
+    parser.add_argument(
+        "--write-queue",
+        type=int,
+        default=4,
+        help="Batches each worker may queue for the database writer before scraping waits",
+    )
+    parser.add_argument(
+        "--dedupe-bloom-bits",
+        type=int,
+        default=0,
+        help="Bits per key for a Bloom filter in front of the dedupe snapshot (0 disables it)",
+    )
+    parser.add_argument(
+        "--preload-keys",
+        action="store_true",
+        help="With Cassandra, load every stored key at start using a parallel token-range scan",
+    )
     parser.add_argument("--headless", action="store_true")
     parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--contexts-per-browser",
+        type=int,
+        default=1,
+        help="Number of workers that share one Chromium process, each in its own context",
+    )
     parser.add_argument("--obfuscate", action="store_true")
     parser.add_argument("--profile-file")
     parser.add_argument("--profile-seed", type=int)
+    parser.add_argument(
+        "--cooldown",
+        choices=["governor", "random"],
+        default="governor",
+        help="Pace cells with the shared rate governor or a random per-worker delay",
+    )
+    parser.add_argument("--start-rate", type=float, default=4.0, help="Governor: initial cells per minute")
+    parser.add_argument("--min-rate", type=float, default=0.5, help="Governor: lowest cells per minute")
+    parser.add_argument("--max-rate", type=float, default=60.0, help="Governor: highest cells per minute")
     parser.add_argument("--min-delay", type=float, default=15.0)
     parser.add_argument("--max-delay", type=float, default=60.0)
+    parser.add_argument(
+        "--harvest-mode",
+        choices=["detail", "feed", "network"],
+        default="detail",
+        help=(
+            "Open every listing (detail), read the result cards in the feed (feed) "
+            "or decode the page's search responses (network)"
+        ),
+    )
+    parser.add_argument(
+        "--record-responses",
+        type=Path,
+        help="Directory to save raw search responses to in network mode",
+    )
+    parser.add_argument(
+        "--detail-fields",
+        type=_parse_detail_fields,
+        default=(),
+        help="Comma separated fields (phone, website, address) worth opening a listing for in feed mode",
+    )
+    parser.add_argument(
+        "--wait-timeouts",
+        type=_parse_wait_timeouts,
+        default={},
+        help="Per-step wait limits in ms, e.g. search=8000,detail=3000,feed=1500,geocode=10000",
+    )
+    parser.add_argument(
+        "--block-resources",
+        action="store_true",
+        help="Abort map tiles, photos, fonts, media and analytics requests",
+    )
+    parser.add_argument(
+        "--block-rules",
+        help="JSON file overriding resource_types/url_patterns/allow_patterns for --block-resources",
+    )
     parser.add_argument("--state-file", default="run_state.json")
+    parser.add_argument(
+        "--cache-db",
+        help=(
+            "SQLite file for the shared geocode cache and coverage index "
+            "(default: mapmonkey_cache.db next to the state file)"
+        ),
+    )
+    parser.add_argument(
+        "--coverage-mode",
+        choices=COVERAGE_MODES,
+        default="record",
+        help="Log scraped cells (record) and skip or down-weight cells already exhausted for a term",
+    )
+    parser.add_argument(
+        "--coverage-max-age",
+        type=float,
+        default=720.0,
+        help="Hours a recorded scrape counts towards coverage decisions",
+    )
     parser.add_argument("--metrics-port", type=int, help="Expose Prometheus metrics on this port")
     parser.add_argument("--flush-interval", type=float, default=1.0, help="State flush interval in seconds")
     parser.add_argument(
@@ -374,6 +626,14 @@ if __name__ == "__main__":
     else:
         args.identity_rng = random.Random(args.profile_seed)
 
+    args.block_policy = None
+    if args.block_resources or args.block_rules:
+        args.block_policy = (
+            RequestBlockPolicy.from_file(args.block_rules, on_block=_count_blocked)
+            if args.block_rules
+            else RequestBlockPolicy(on_block=_count_blocked)
+        )
+
     if args.metrics_port:
         if not PROMETHEUS_AVAILABLE:
             raise SystemExit(
@@ -0,0 +1,369 @@
+"""Columnar storage: compressed Parquet files partitioned by city and term."""
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from urllib.parse import quote
+
+# pyarrow is optional; only needed when the parquet backend is selected.
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+from csv_store import CSV_COLUMNS
+from dedupe_index import business_key
+
+_QUOTED_CITY = re.compile(r'^\s*"([^"]*)"\s*(.*)$')
+_PART_NAME = re.compile(r"^part-(\d+)-(\d+)\.parquet$")
+# What Hive-style readers expect for an empty partition value.
+_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def split_query(query: str) -> tuple[str, str]:
+    """Split the orchestrator's ``"City" term`` search into city and term."""
+    match = _QUOTED_CITY.match(query or "")
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return "", (query or "").strip()
+
+
+def business_schema():
+    return pa.schema(
+        [
+            ("name", pa.string()),
+            ("address", pa.string()),
+            ("website", pa.string()),
+            ("phone", pa.string()),
+            ("reviews_average", pa.float64()),
+            ("query", pa.string()),
+            ("latitude", pa.float64()),
+            ("longitude", pa.float64()),
+        ]
+    )
+
+
+class ParquetStore:
+    """Business rows as Parquet files under ``city=<city>/term=<term>/``.
+
+    The Hive-style directories let ``pyarrow.dataset`` (or Spark, DuckDB,
+    ...) skip partitions when filtering by city or term. Rows are first
+    recorded in ``_manifest.db`` next to the partitions and written out as
+    one file per partition once ``flush_rows`` rows or ``flush_seconds``
+    have accumulated, and when the store is closed. The manifest also holds
+    the normalised key of every stored business, for deduplication, and the
+    row count of every file, so counts never open a Parquet file. Buffered
+    rows survive a crash and are written by the next run.
+    """
+
+    def __init__(
+        self,
+        root: os.PathLike | str,
+        *,
+        flush_rows: int = 5000,
+        flush_seconds: float = 300.0,
+        compression: str = "zstd",
+        readonly: bool = False,
+    ) -> None:
+        if pa is None:
+            raise RuntimeError(
+                "Parquet selected but pyarrow is not installed. Install with: pip install pyarrow"
+            )
+        self.root = Path(root)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.compression = compression
+        self.readonly = readonly
+        self.users = 0
+        self._lock = threading.Lock()
+        manifest = self.root / "_manifest.db"
+        if readonly:
+            self.conn = sqlite3.connect(
+                f"{manifest.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+            )
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(manifest, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA busy_timeout=30000;")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS business_keys (
+                name TEXT NOT NULL,
+                address TEXT NOT NULL,
+                PRIMARY KEY (name, address)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                city TEXT,
+                term TEXT,
+                rows INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pending (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                city TEXT NOT NULL,
+                term TEXT NOT NULL,
+                name TEXT,
+                address TEXT,
+                website TEXT,
+                phone TEXT,
+                reviews_average REAL,
+                query TEXT,
+                latitude REAL,
+                longitude REAL,
+                added_at REAL NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+        self._recover()
+
+    def partition_dir(self, city: str, term: str) -> Path:
+        city_part = quote(city, safe="") or _DEFAULT_PARTITION
+        term_part = quote(term, safe="") or _DEFAULT_PARTITION
+        return self.root / f"city={city_part}" / f"term={term_part}"
+
+    def append(self, values_seq: list[tuple]) -> list[tuple]:
+        """Buffer rows whose key is not stored yet and return them."""
+        if self.readonly:
+            raise RuntimeError(f"{self.root} was opened read-only")
+        now = time.time()
+        inserted: list[tuple] = []
+        with self._lock:
+            for values in values_seq:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO business_keys (name, address) VALUES (?, ?)",
+                    business_key(values[0], values[1]),
+                )
+                if not cursor.rowcount:
+                    continue
+                city, term = split_query(values[5])
+                self.conn.execute(
+                    """
+                    INSERT INTO pending (
+                        city, term, name, address, website, phone, reviews_average,
+                        query, latitude, longitude, added_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (city, term, *values, now),
+                )
+                inserted.append(values)
+            self.conn.commit()
+            self._flush_due()
+        return inserted
+
+    def _flush_due(self) -> None:
+        due = self.conn.execute(
+            """
+            SELECT city, term FROM pending
+            GROUP BY city, term
+            HAVING COUNT(*) >= ? OR MIN(added_at) <= ?
+            """,
+            (self.flush_rows, time.time() - self.flush_seconds),
+        ).fetchall()
+        for city, term in due:
+            self._flush_partition(city, term)
+
+    def flush(self) -> None:
+        """Write every buffered row to Parquet."""
+        with self._lock:
+            for city, term in self.conn.execute(
+                "SELECT DISTINCT city, term FROM pending"
+            ).fetchall():
+                self._flush_partition(city, term)
+
+    def _flush_partition(self, city: str, term: str) -> None:
+        rows = self.conn.execute(
+            f"""
+            SELECT id, {", ".join(CSV_COLUMNS)} FROM pending
+            WHERE city = ? AND term = ? ORDER BY id
+            """,
+            (city, term),
+        ).fetchall()
+        if not rows:
+            return
+        first, last = rows[0][0], rows[-1][0]
+        directory = self.partition_dir(city, term)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{first:012d}-{last:012d}.parquet"
+        columns = list(zip(*(row[1:] for row in rows)))
+        table = pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, business_schema())],
+            schema=business_schema(),
+        )
+        tmp = path.with_name(path.name + ".tmp")
+        pq.write_table(table, tmp, compression=self.compression)
+        os.replace(tmp, path)
+        self._register(path, city, term, first, last, len(rows))
+
+    def _register(self, path: Path, city: str, term: str, first: int, last: int, count: int) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, city, term, rows, created_at) VALUES (?, ?, ?, ?, ?)",
+                (str(path.relative_to(self.root)), city, term, count, time.time()),
+            )
+            self.conn.execute(
+                "DELETE FROM pending WHERE city = ? AND term = ? AND id BETWEEN ? AND ?",
+                (city, term, first, last),
+            )
+
+    def _recover(self) -> None:
+        """Register files that were written but not recorded before a crash."""
+        known = {row[0] for row in self.conn.execute("SELECT path FROM files")}
+        partitions = self.conn.execute("SELECT DISTINCT city, term FROM pending").fetchall()
+        for city, term in partitions:
+            directory = self.partition_dir(city, term)
+            if not directory.exists():
+                continue
+            for path in directory.glob("part-*.parquet"):
+                match = _PART_NAME.match(path.name)
+                if not match or str(path.relative_to(self.root)) in known:
+                    continue
+                first, last = int(match.group(1)), int(match.group(2))
+                count = pq.ParquetFile(path).metadata.num_rows
+                self._register(path, city, term, first, last, count)
+
+    def iter_rows(
+        self,
+        *,
+        city: Optional[str] = None,
+        term: Optional[str] = None,
+        batch_size: int = 5000,
+    ) -> Iterator[list[tuple]]:
+        """Yield stored rows in batches, reading only the matching partitions.
+
+        ``city`` and ``term`` compare case-insensitively with the partition
+        values. Rows still buffered in the manifest come last.
+        """
+        where, params = ["1 = 1"], []
+        if city is not None:
+            where.append("LOWER(city) = ?")
+            params.append(city.lower())
+        if term is not None:
+            where.append("LOWER(term) = ?")
+            params.append(term.lower())
+        clause = " AND ".join(where)
+        with self._lock:
+            files = self.conn.execute(
+                f"SELECT path FROM files WHERE {clause} ORDER BY created_at, path", params
+            ).fetchall()
+        for (path,) in files:
+            parquet_file = pq.ParquetFile(self.root / path)
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=CSV_COLUMNS):
+                yield [tuple(row[column] for column in CSV_COLUMNS) for row in batch.to_pylist()]
+        with self._lock:
+            cursor = self.conn.execute(
+                f"SELECT {', '.join(CSV_COLUMNS)} FROM pending WHERE {clause} ORDER BY id", params
+            )
+            buffered = cursor.fetchall()
+        for start in range(0, len(buffered), batch_size):
+            yield buffered[start : start + batch_size]
+
+    def changes(self, since: int = 0, *, batch_size: int = 5000) -> Iterator[tuple[list[tuple], int]]:
+        """Yield rows whose manifest id is above ``since``, with the id to resume from.
+
+        Files are named after the first and last id they hold, so only files
+        that end past ``since`` are read. Such a file may also hold rows that
+        were sent before, while they were still buffered. The mark only moves
+        with the last (possibly empty) batch.
+        """
+        with self._lock:
+            # One read transaction, so a flush cannot move rows between the two lists.
+            self.conn.execute("BEGIN")
+            try:
+                files = self.conn.execute("SELECT path FROM files ORDER BY path").fetchall()
+                buffered = self.conn.execute(
+                    f"SELECT id, {', '.join(CSV_COLUMNS)} FROM pending WHERE id > ? ORDER BY id",
+                    (since,),
+                ).fetchall()
+            finally:
+                self.conn.execute("COMMIT")
+        newest = since
+        for (path,) in files:
+            match = _PART_NAME.match(Path(path).name)
+            if not match or int(match.group(2)) <= since:
+                continue
+            newest = max(newest, int(match.group(2)))
+            parquet_file = pq.ParquetFile(self.root / path)
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=CSV_COLUMNS):
+                yield [tuple(row[column] for column in CSV_COLUMNS) for row in batch.to_pylist()], since
+        if buffered:
+            newest = max(newest, buffered[-1][0])
+        for start in range(0, len(buffered), batch_size):
+            yield [row[1:] for row in buffered[start : start + batch_size]], since
+        yield [], newest
+
+    def keys(self) -> list[tuple[str, str]]:
+        """Return the normalised key of every stored business."""
+        with self._lock:
+            return self.conn.execute("SELECT name, address FROM business_keys").fetchall()
+
+    def count(self) -> int:
+        with self._lock:
+            stored = self.conn.execute("SELECT COALESCE(SUM(rows), 0) FROM files").fetchone()[0]
+            buffered = self.conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        return int(stored) + int(buffered)
+
+    def recent(self, limit: int) -> list[dict[str, Any]]:
+        """Return up to ``limit`` of the latest rows, newest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(CSV_COLUMNS)} FROM pending ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            records = [dict(zip(CSV_COLUMNS, row)) for row in rows]
+            files = self.conn.execute(
+                "SELECT path FROM files ORDER BY created_at DESC, path DESC"
+            ).fetchall()
+        for (path,) in files:
+            if len(records) >= limit:
+                break
+            table = pq.read_table(self.root / path, columns=CSV_COLUMNS)
+            tail = table.slice(max(table.num_rows - (limit - len(records)), 0)).to_pylist()
+            records.extend(reversed(tail))
+        return records
+
+    def close(self) -> None:
+        if not self.readonly:
+            self.flush()
+        with self._lock:
+            self.conn.close()
+
+
+_parquet_stores: dict[Path, ParquetStore] = {}
+_parquet_stores_lock = threading.Lock()
+
+
+def open_parquet_store(root: os.PathLike | str) -> ParquetStore:
+    """Return the process-wide store for ``root`` so workers share one buffer."""
+    resolved = Path(root).resolve()
+    with _parquet_stores_lock:
+        store = _parquet_stores.get(resolved)
+        if store is None:
+            store = _parquet_stores[resolved] = ParquetStore(
+                root,
+                flush_rows=int(os.environ.get("PARQUET_FLUSH_ROWS", "5000")),
+                flush_seconds=float(os.environ.get("PARQUET_FLUSH_SECONDS", "300")),
+                compression=os.environ.get("PARQUET_COMPRESSION", "zstd"),
+            )
+        store.users += 1
+        return store
+
+
+def release_parquet_store(store: ParquetStore) -> None:
+    with _parquet_stores_lock:
+        store.users -= 1
+        if store.users > 0:
+            return
+        resolved = store.root.resolve()
+        if _parquet_stores.get(resolved) is store:
+            del _parquet_stores[resolved]
+    store.close()
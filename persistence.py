@@ -0,0 +1,138 @@
+"""Write scraped batches to the store without blocking the event loop."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from storage_manager import BusinessRecord, BusinessStore
+
+logger = logging.getLogger(__name__)
+
+SavedCallback = Callable[[List[Dict]], Awaitable[None]]
+ErrorCallback = Callable[[Exception], Awaitable[None]]
+
+
+class PersistencePipeline:
+    """Queue batches for a single writer thread that owns the store.
+
+    :meth:`submit` returns as soon as the batch is queued, so scraping goes
+    on while the database commits. At most ``max_pending`` batches wait in
+    the queue; further submits block until the writer catches up, which
+    keeps memory bounded when the database is slower than the scraper.
+    ``on_saved`` runs on the event loop once a batch has been committed and
+    the returned future resolves to the number of new records.
+    """
+
+    def __init__(self, store: BusinessStore, *, max_pending: int = 4) -> None:
+        self.store = store
+        self.max_pending = max(1, max_pending)
+        self.batches = 0
+        self.saved = 0
+        self.failures = 0
+        self.write_seconds = 0.0
+        self.backpressure_seconds = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-writer")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._closed:
+            raise RuntimeError("persistence pipeline is closed")
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._task = asyncio.create_task(self._run())
+        return self._queue
+
+    async def submit(
+        self,
+        records: Iterable[BusinessRecord],
+        *,
+        on_saved: Optional[SavedCallback] = None,
+        on_error: Optional[ErrorCallback] = None,
+    ) -> "asyncio.Future[int]":
+        """Queue ``records`` and return a future for the number saved."""
+        queue = self._ensure_started()
+        future: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        started = time.monotonic()
+        await queue.put((list(records), on_saved, on_error, future))
+        self.backpressure_seconds += time.monotonic() - started
+        return future
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            try:
+                if item is None:
+                    return
+                await self._write(loop, *item)
+            finally:
+                self._queue.task_done()
+
+    async def _write(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        records: List[BusinessRecord],
+        on_saved: Optional[SavedCallback],
+        on_error: Optional[ErrorCallback],
+        future: "asyncio.Future[int]",
+    ) -> None:
+        started = time.monotonic()
+        try:
+            inserted = await loop.run_in_executor(self._executor, self.store.save_new, records)
+        except Exception as exc:
+            self.failures += 1
+            await self._call(on_error, exc)
+            # A partly written batch still reports the rows that were stored.
+            inserted = getattr(exc, "saved", [])
+        finally:
+            self.write_seconds += time.monotonic() - started
+            self.batches += 1
+        self.saved += len(inserted)
+        if inserted:
+            await self._call(on_saved, inserted)
+        if not future.done():
+            future.set_result(len(inserted))
+
+    @staticmethod
+    async def _call(callback: Optional[Callable[[Any], Awaitable[None]]], value: Any) -> None:
+        if callback is None:
+            return
+        try:
+            await callback(value)
+        except Exception:  # noqa: BLE001 - a failing callback must not stop the writer
+            logger.exception("Persistence callback failed")
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def flush(self) -> None:
+        """Wait until every queued batch has been written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Write everything still queued, then stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._queue is not None and self._task is not None:
+            await self._queue.put(None)
+            await self._task
+        self._executor.shutdown(wait=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "batches": self.batches,
+            "saved": self.saved,
+            "failures": self.failures,
+            "write_seconds": round(self.write_seconds, 3),
+            "backpressure_seconds": round(self.backpressure_seconds, 3),
+        }
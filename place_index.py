@@ -0,0 +1,127 @@
+"""Index of Google place identifiers that are already stored."""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PlaceIndex:
+    """Remember which place IDs have been saved so listings can be skipped
+    before they are opened.
+
+    The IDs are kept in memory for lookups and persisted to the shared cache
+    database so every worker and later run benefits. Entries are filed under
+    the store they were saved to (see :func:`db.business_store_scope`), so
+    switching ``--store`` or ``--dsn`` starts from an empty index instead of
+    skipping places the new store does not have. Each scope also remembers
+    the store's fingerprint (:func:`db.business_store_fingerprint`); when a
+    file at the same path has a different first row it was replaced, and the
+    scope's entries are dropped.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.scope: Optional[str] = None
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA busy_timeout=30000;")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS store_places (
+                scope TEXT NOT NULL,
+                place_id TEXT NOT NULL,
+                name TEXT,
+                address TEXT,
+                seen_at REAL,
+                PRIMARY KEY (scope, place_id)
+            ) WITHOUT ROWID
+            """
+        )
+        # The unscoped table from before store_places cannot be attributed
+        # to a store, so its rows are dropped rather than trusted.
+        self.conn.execute("DROP TABLE IF EXISTS places")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS place_scopes (
+                scope TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+        self._ids: set[str] = set()
+
+    def load(self, scope: str, fingerprint: str = "") -> bool:
+        """Load the IDs recorded for ``scope`` unless that already happened.
+
+        Every store sharing the index must belong to the same scope. Returns
+        True for the call that performed the load.
+        """
+        with self._lock:
+            if self.scope is not None:
+                if scope != self.scope:
+                    raise ValueError(f"Place index is already loaded for {self.scope}, not {scope}")
+                return False
+            self.scope = scope
+            row = self.conn.execute(
+                "SELECT fingerprint FROM place_scopes WHERE scope = ?", (scope,)
+            ).fetchone()
+            if row and row[0] and fingerprint and row[0] != fingerprint:
+                logger.info("Store for %s was replaced; forgetting its known places", scope)
+                self.conn.execute("DELETE FROM store_places WHERE scope = ?", (scope,))
+            self._set_fingerprint(fingerprint)
+            self.conn.commit()
+            self._ids = {
+                row[0]
+                for row in self.conn.execute("SELECT place_id FROM store_places WHERE scope = ?", (scope,))
+            }
+            return True
+
+    def note_fingerprint(self, fingerprint: str) -> None:
+        """Remember the store's fingerprint once it has rows, e.g. on close."""
+        with self._lock:
+            if self.scope is not None and fingerprint:
+                self._set_fingerprint(fingerprint)
+                self.conn.commit()
+
+    def _set_fingerprint(self, fingerprint: str) -> None:
+        # An empty store has no fingerprint yet; keep whatever was recorded.
+        if fingerprint:
+            self.conn.execute(
+                "INSERT INTO place_scopes (scope, fingerprint) VALUES (?, ?) "
+                "ON CONFLICT(scope) DO UPDATE SET fingerprint = excluded.fingerprint",
+                (self.scope, fingerprint),
+            )
+
+    def __contains__(self, place_id: Optional[str]) -> bool:
+        return bool(place_id) and place_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_many(self, entries: Iterable[tuple[str, str, str]]) -> None:
+        """Record ``(place_id, name, address)`` tuples for the loaded scope."""
+        if self.scope is None:
+            raise RuntimeError("PlaceIndex.load() must be called before add_many()")
+        now = time.time()
+        rows = [(self.scope, pid, name, address, now) for pid, name, address in entries if pid]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO store_places (scope, place_id, name, address, seen_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+            self._ids.update(row[1] for row in rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,119 @@
+"""Process-wide pacing of map searches shared by every worker."""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from callbacks import notify
+
+THROTTLE_SIGNALS = ("captcha", "consent", "empty_feed", "timeout")
+
+
+class RateGovernor:
+    """Token bucket with additive-increase / multiplicative-decrease control.
+
+    Workers call :meth:`acquire` before each cell and report the outcome.
+    Every healthy cell raises the rate by ``increase`` cells per minute up to
+    ``max_rate``; a throttling signal multiplies it by ``decrease`` (down to
+    ``min_rate``) and empties the bucket so all workers pause together.
+
+    Each waiter takes a numbered ticket and proceeds once the tokens added
+    since the start reach it, so tokens go out in arrival order. Waiters
+    recompute their wait from the current rate, so a back-off slows the ones
+    already queued as well.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 4.0,
+        min_rate: float = 0.5,
+        max_rate: float = 60.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        burst: float = 1.0,
+        on_change: Optional[Callable[["RateGovernor", Optional[str]], None]] = None,
+    ) -> None:
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = max(1.0, burst)
+        self.on_change = on_change
+        self.successes = 0
+        self.backoffs = 0
+        self.recent_backoffs: deque[Dict[str, Any]] = deque(maxlen=20)
+        # Tokens added and tickets handed out since the start; the bucket
+        # holds ``_supply - _issued`` tokens, negative while workers queue.
+        self._supply = 1.0
+        self._issued = 0
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._supply = min(
+            self._issued + self.burst,
+            self._supply + (now - self._updated) * self.rate / 60.0,
+        )
+        self._updated = now
+
+    async def acquire(
+        self,
+        heartbeat: Optional[Callable[[], Optional[Awaitable[None]]]] = None,
+        *,
+        poll: float = 5.0,
+    ) -> float:
+        """Wait for a token and return the seconds spent waiting.
+
+        Taking a ticket never waits, so every queued worker sleeps on its own
+        and awaits ``heartbeat`` at least every ``poll`` seconds.
+        """
+        started = time.monotonic()
+        self._refill()
+        self._issued += 1
+        ticket = self._issued
+        while True:
+            self._refill()
+            if self._supply >= ticket:
+                return time.monotonic() - started
+            needed = (ticket - self._supply) * 60.0 / self.rate
+            await asyncio.sleep(min(needed, poll))
+            await notify(heartbeat)
+
+    def report_success(self) -> None:
+        self.successes += 1
+        self._refill()
+        previous = self.rate
+        self.rate = min(self.max_rate, self.rate + self.increase)
+        if self.rate != previous and self.on_change is not None:
+            self.on_change(self, None)
+
+    def report_throttle(self, reason: str) -> None:
+        self._refill()
+        self.backoffs += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        # Drop any saved tokens and the head waiter's partial progress.
+        self._supply = min(self._issued, math.floor(self._supply))
+        self.recent_backoffs.append({"reason": reason, "rate": self.rate, "timestamp": time.time()})
+        if self.on_change is not None:
+            self.on_change(self, reason)
+
+    def report(self, signal: Optional[str]) -> None:
+        if signal:
+            self.report_throttle(signal)
+        else:
+            self.report_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate_per_minute": round(self.rate, 3),
+            "min_rate": self.min_rate,
+            "max_rate": self.max_rate,
+            "successes": self.successes,
+            "backoffs": self.backoffs,
+            "recent_backoffs": list(self.recent_backoffs),
+        }
@@ -2,11 +2,31 @@ import asyncio
 import logging
 import random
 import re
-from typing import Any, Callable, Dict, Optional, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence
 
 from playwright.async_api import Page, async_playwright
-
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from callbacks import notify
+from coverage_index import CoverageIndex
+from extractors import (
+    DEFAULT_EXTRACTOR,
+    DEFAULT_FEED_EXTRACTOR,
+    FeedExtractor,
+    ListingDetails,
+    ListingExtractor,
+    parse_place_id,
+)
+from feed_scroll import FeedScroller
+from geocode_store import GeocodeStore
+from grid_planner import DEFAULT_ZOOM, QuadtreePlanner, UniformPlanner
+from network_capture import SearchResponseCollector
+from persistence import PersistencePipeline
+from rate_governor import RateGovernor
 from storage_manager import BusinessRecord, BusinessStore
+from waits import WaitEngine
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -17,35 +37,50 @@ RESET = "\033[0m"
 _geocode_cache: dict[str, tuple[float, float]] = {}
 
 
-async def _notify(callback: Optional[Callable], *args, **kwargs) -> None:
-    if callback is None:
-        return
-    result = callback(*args, **kwargs)
-    if asyncio.iscoroutine(result):
-        await result
+@dataclass
+class CellResult:
+    """Outcome of one search at one map position."""
 
+    found: int = 0
+    saved: int = 0
+    skipped: int = 0
+    # Listings dropped because no address could be read for them.
+    incomplete: int = 0
+    # Throttling signal seen while scraping (see rate_governor.THROTTLE_SIGNALS).
+    signal: Optional[str] = None
+    # How the feed scroll ended (see feed_scroll.SCROLL_REASONS).
+    scroll: Optional[str] = None
 
-async def _geocode_city(page: Page, city: str) -> tuple[float, float]:
+
+async def _geocode_city(
+    page: Page,
+    city: str,
+    *,
+    waits: Optional[WaitEngine] = None,
+    geocode_store: Optional[GeocodeStore] = None,
+) -> tuple[float, float]:
     cached = _geocode_cache.get(city)
     if cached:
         return cached
+    if geocode_store is not None:
+        stored = geocode_store.get(city)
+        if stored:
+            _geocode_cache[city] = stored
+            return stored
+    waits = waits or WaitEngine()
     await page.goto("https://www.google.com/maps", timeout=60000)
     await page.fill("//input[@id='searchboxinput']", city)
     await page.keyboard.press("Enter")
-    try:
-        await page.wait_for_selector(
-            "//a[contains(@href, 'https://www.google.com/maps/place')]",
-            timeout=15000,
-        )
-    except Exception:
+    if not await waits.url_has_coordinates(page):
         logger.warning("Timed out waiting for city results for %s", city)
-    await page.wait_for_timeout(1000)
     match = re.search(r"@(-?\d+\.\d+),(-?\d+\.\d+)", page.url)
     if not match:
         raise ValueError(f"Could not find coordinates for city: {city}")
     lat = float(match.group(1))
     lon = float(match.group(2))
     _geocode_cache[city] = (lat, lon)
+    if geocode_store is not None:
+        geocode_store.put(city, lat, lon)
     return lat, lon
 
 
@@ -63,166 +98,403 @@ async def scrape_at_location(
     event_cb: Optional[Callable] = None,
     business_cb: Optional[Callable] = None,
     batch_size: int = 10,
-) -> None:
-    await _notify(event_cb, "info", f"Scraping {query} at {lat:.5f},{lon:.5f}", context=context)
+    extractor: Optional[ListingExtractor] = None,
+    mode: str = "detail",
+    detail_fields: Sequence[str] = (),
+    feed_extractor: Optional[FeedExtractor] = None,
+    record_dir: Optional[Path] = None,
+    waits: Optional[WaitEngine] = None,
+    zoom: int = DEFAULT_ZOOM,
+    scroller: Optional[FeedScroller] = None,
+    writer: Optional[PersistencePipeline] = None,
+) -> CellResult:
+    """Search ``query`` around a point and store the listings it returns.
+
+    ``mode="detail"`` opens every listing. ``mode="feed"`` reads the result
+    cards instead and only opens a listing when one of ``detail_fields``
+    (e.g. ``"phone"`` or ``"website"``) is missing from its card.
+    ``mode="network"`` decodes the page's own search responses and falls back
+    to the detail panels when none could be read; ``record_dir`` keeps the raw
+    response bodies for use as fixtures.
+
+    Batches are handed to ``writer`` and written in the background; the
+    call returns once every batch of this cell has been committed.
+    """
+    extractor = extractor or DEFAULT_EXTRACTOR
+    waits = waits or WaitEngine()
+    own_writer = writer is None
+    if writer is None:
+        writer = PersistencePipeline(store)
+    await notify(event_cb, "info", f"Scraping {query} at {lat:.5f},{lon:.5f}", context=context)
+
+    collector: Optional[SearchResponseCollector] = None
+    if mode == "network":
+        collector = SearchResponseCollector(query, record_dir=record_dir)
+        collector.attach(page)
+    try:
+        return await _scrape_results(
+            page,
+            query,
+            total,
+            lat,
+            lon,
+            store=store,
+            context=context,
+            progress_cb=progress_cb,
+            heartbeat_cb=heartbeat_cb,
+            event_cb=event_cb,
+            business_cb=business_cb,
+            batch_size=batch_size,
+            extractor=extractor,
+            mode=mode,
+            detail_fields=detail_fields,
+            feed_extractor=feed_extractor,
+            collector=collector,
+            waits=waits,
+            zoom=zoom,
+            scroller=scroller or FeedScroller(stall_ms=waits.timeouts["feed"]),
+            writer=writer,
+        )
+    finally:
+        if collector is not None:
+            collector.detach()
+        if own_writer:
+            await writer.close()
+
 
-    await page.goto(f"https://www.google.com/maps/@{lat},{lon},15z", timeout=60000)
+async def _scrape_results(
+    page: Page,
+    query: str,
+    total: int,
+    lat: float,
+    lon: float,
+    *,
+    store: BusinessStore,
+    context: Dict[str, Any],
+    progress_cb: Optional[Callable],
+    heartbeat_cb: Optional[Callable],
+    event_cb: Optional[Callable],
+    business_cb: Optional[Callable],
+    batch_size: int,
+    extractor: ListingExtractor,
+    mode: str,
+    detail_fields: Sequence[str],
+    feed_extractor: Optional[FeedExtractor],
+    collector: Optional[SearchResponseCollector],
+    waits: WaitEngine,
+    zoom: int,
+    scroller: FeedScroller,
+    writer: PersistencePipeline,
+) -> CellResult:
+    await page.goto(f"https://www.google.com/maps/@{lat},{lon},{zoom}z", timeout=60000)
     await page.fill("//input[@id='searchboxinput']", query)
     await page.keyboard.press("Enter")
-    await page.wait_for_timeout(2000)
-    await _notify(progress_cb, 0, total)
-
-    results_locator = page.locator("//a[contains(@href, 'https://www.google.com/maps/place')]")
-    previous_count = -1
-    stagnation_loops = 0
-    max_loops = 20
-    while True:
-        await _notify(heartbeat_cb)
-        try:
-            current_count = await results_locator.count()
-        except Exception:
-            current_count = 0
-        if current_count >= total:
-            break
-        if current_count == previous_count:
-            stagnation_loops += 1
-        else:
-            stagnation_loops = 0
-        if stagnation_loops > 5 or max_loops <= 0:
-            break
-        previous_count = current_count
-        max_loops -= 1
-        await page.mouse.wheel(0, 2000)
-        try:
-            await page.wait_for_function(
-                "(expected) => document.querySelectorAll(\"a[href^='https://www.google.com/maps/place']\").length >= expected",
-                arg=current_count + 1,
-                timeout=2000,
-            )
-        except Exception:
-            await page.wait_for_timeout(750)
+    results_ready = await waits.results_ready(page)
+    blocked = _blocked_signal(page.url)
+    if blocked:
+        await notify(event_cb, "warning", f"Search blocked by a {blocked} page", context=context)
+        return CellResult(signal=blocked)
+    await notify(progress_cb, 0, total)
+
+    # The feed harvest and the place IDs pair listings with result cards by
+    # position, so every list is built from the same anchor selector.
+    results_locator = page.locator(waits.anchor_selector)
+    await notify(heartbeat_cb)
+    scroll_reason = None
+    try:
+        outcome = await scroller.scroll(page, total, heartbeat=heartbeat_cb)
+    except Exception as exc:
+        await notify(event_cb, "warning", f"Feed scroll failed: {exc}", context=context)
+    else:
+        scroll_reason = outcome.reason
+        waits.record("scroll", outcome.elapsed_ms, outcome.reason in {"stalled", "timeout"})
+        logger.info(
+            "Feed scroll ended (%s) with %d results after %.0f ms",
+            outcome.reason,
+            outcome.count,
+            outcome.elapsed_ms,
+        )
 
     listings = []
     try:
         listings = await results_locator.all()
     except Exception as exc:
-        await _notify(event_cb, "error", f"Failed to enumerate listings: {exc}", context=context)
-
+        await notify(event_cb, "error", f"Failed to enumerate listings: {exc}", context=context)
+
+    found = len(collector.records) if collector is not None and collector.records else len(listings)
+    result = CellResult(found=found, scroll=scroll_reason)
+    # A feed, a single place or Maps' "no results" message all answer the
+    # search; only a page showing none of them points at throttling.
+    if not found and not results_ready and not await waits.shows_no_results(page):
+        result.signal = "empty_feed"
     listings = listings[:total]
-    saved_count = 0
+    if collector is not None and not collector.records:
+        await notify(
+            event_cb,
+            "warning",
+            f"No search payloads decoded ({collector.responses} responses); falling back to the DOM",
+            context=context,
+        )
     batch: list[BusinessRecord] = []
 
+    if collector is not None and collector.records:
+        captured = collector.take(total)
+        fresh = [record for record in captured if not store.knows_place(record.place_id)]
+        result.skipped = len(captured) - len(fresh)
+        records = _iterate(fresh)
+    elif mode == "feed":
+        records = _harvest_feed(
+            page,
+            query,
+            listings,
+            total,
+            extractor=extractor,
+            feed_extractor=feed_extractor or DEFAULT_FEED_EXTRACTOR,
+            detail_fields=detail_fields,
+            waits=waits,
+            store=store,
+            result=result,
+            context=context,
+            heartbeat_cb=heartbeat_cb,
+            event_cb=event_cb,
+        )
+    else:
+        records = _open_listings(
+            page,
+            query,
+            listings,
+            extractor=extractor,
+            waits=waits,
+            store=store,
+            result=result,
+            context=context,
+            heartbeat_cb=heartbeat_cb,
+            event_cb=event_cb,
+        )
+
+    pending: list[asyncio.Future] = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            pending.append(
+                await _queue_batch(
+                    writer,
+                    batch,
+                    result=result,
+                    total=total,
+                    context=context,
+                    progress_cb=progress_cb,
+                    event_cb=event_cb,
+                    business_cb=business_cb,
+                    failure_message="Failed to persist batch",
+                )
+            )
+            batch = []
+
+    if batch:
+        pending.append(
+            await _queue_batch(
+                writer,
+                batch,
+                result=result,
+                total=total,
+                context=context,
+                progress_cb=progress_cb,
+                event_cb=event_cb,
+                business_cb=business_cb,
+                failure_message="Failed to persist final batch",
+            )
+        )
+    # The planner and coverage index need this cell's saved count.
+    await asyncio.gather(*pending)
+
+    if result.skipped:
+        await notify(
+            event_cb,
+            "info",
+            f"Skipped {result.skipped} already stored places without opening them",
+            context=context,
+        )
+    if result.incomplete:
+        await notify(
+            event_cb,
+            "warning",
+            f"Dropped {result.incomplete} listings without an address",
+            context=context,
+        )
+    await notify(progress_cb, min(result.saved, total), total)
+    await notify(heartbeat_cb)
+    return result
+
+
+def _blocked_signal(url: str) -> Optional[str]:
+    if "/sorry/" in url:
+        return "captcha"
+    if "consent.google." in url:
+        return "consent"
+    return None
+
+
+async def _iterate(records: list[BusinessRecord]) -> AsyncIterator[BusinessRecord]:
+    for record in records:
+        yield record
+
+
+async def _open_listings(
+    page: Page,
+    query: str,
+    listings: list,
+    *,
+    extractor: ListingExtractor,
+    waits: WaitEngine,
+    store: BusinessStore,
+    result: CellResult,
+    context: Dict[str, Any],
+    heartbeat_cb: Optional[Callable],
+    event_cb: Optional[Callable],
+) -> AsyncIterator[BusinessRecord]:
+    """Click every listing not yet stored and read its detail panel."""
+    previous_name = ""
     for listing in listings:
-        await _notify(heartbeat_cb)
+        # Read the label and link from the listing itself so the place ID can
+        # never belong to a different result.
         try:
-            await listing.click()
-            await page.wait_for_timeout(1500)
-        except Exception as exc:
-            await _notify(event_cb, "warning", f"Failed to open listing: {exc}", context=context)
+            label = await listing.get_attribute("aria-label") or ""
+            href = await listing.get_attribute("href") or ""
+        except Exception:
+            label, href = "", ""
+        place_id = parse_place_id(href)
+        if store.knows_place(place_id):
+            result.skipped += 1
             continue
+        await notify(heartbeat_cb)
+        details = await _read_detail_panel(
+            page,
+            listing,
+            extractor=extractor,
+            waits=waits,
+            expected_name=label,
+            previous_name=previous_name,
+            context=context,
+            event_cb=event_cb,
+        )
+        if details is not None:
+            previous_name = details.name
+            record = details.to_record(query)
+            record.place_id = place_id or record.place_id
+            yield record
 
-        name_locator = page.locator("h1.DUwDvf.lfPIob")
-        name = await name_locator.inner_text() if await name_locator.count() else ""
 
-        address_locator = page.locator(
-            "//button[@data-item-id='address']//div[contains(@class, 'fontBodyMedium')]"
-        )
-        address = ""
-        if await address_locator.count():
-            try:
-                address = await address_locator.nth(0).inner_text()
-            except Exception:
-                address = ""
+async def _harvest_feed(
+    page: Page,
+    query: str,
+    listings: list,
+    total: int,
+    *,
+    extractor: ListingExtractor,
+    feed_extractor: FeedExtractor,
+    detail_fields: Sequence[str],
+    waits: WaitEngine,
+    store: BusinessStore,
+    result: CellResult,
+    context: Dict[str, Any],
+    heartbeat_cb: Optional[Callable],
+    event_cb: Optional[Callable],
+) -> AsyncIterator[BusinessRecord]:
+    """Build records from the result cards, opening a listing only when needed."""
+    try:
+        cards = await feed_extractor.harvest(page)
+    except Exception as exc:
+        await notify(event_cb, "error", f"Failed to harvest feed: {exc}", context=context)
+        return
 
-        website_locator = page.locator(
-            "//a[@data-item-id='authority']//div[contains(@class, 'fontBodyMedium')]"
-        )
-        website = ""
-        if await website_locator.count():
-            try:
-                website = await website_locator.nth(0).inner_text()
-            except Exception:
-                website = ""
+    for card in cards[:total]:
+        if store.knows_place(card.place_id):
+            result.skipped += 1
+            continue
+        record = card.to_record(query)
+        # The address is part of the dedupe key, so a card without one is
+        # always completed from its panel.
+        missing = card.missing(["address", *(f for f in detail_fields if f != "address")])
+        if missing and card.index < len(listings):
+            await notify(heartbeat_cb)
+            details = await _read_detail_panel(
+                page,
+                listings[card.index],
+                extractor=extractor,
+                waits=waits,
+                expected_name=card.name,
+                context=context,
+                event_cb=event_cb,
+            )
+            if details is not None:
+                for field_name in missing:
+                    setattr(record, field_name, getattr(details, field_name))
+        if not record.address:
+            result.incomplete += 1
+            continue
+        yield record
 
-        phone_locator = page.locator(
-            "//button[contains(@data-item-id, 'phone')]//div[contains(@class, 'fontBodyMedium')]"
-        )
-        phone = ""
-        if await phone_locator.count():
-            try:
-                phone = await phone_locator.nth(0).inner_text()
-            except Exception:
-                phone = ""
 
-        reviews_average = None
-        reviews_locator = page.locator(
-            "//div[@jsaction='pane.reviewChart.moreReviews']//div[@role='img']"
-        )
-        if await reviews_locator.count():
-            text = await reviews_locator.get_attribute("aria-label")
-            if text:
-                try:
-                    reviews_average = float(text.split()[0].replace(",", "."))
-                except ValueError:
-                    reviews_average = None
-
-        match = re.search(r"@(-?\d+\.\d+),(-?\d+\.\d+)", page.url)
-        lat_val = float(match.group(1)) if match else None
-        lon_val = float(match.group(2)) if match else None
-
-        record = BusinessRecord(
-            name=name,
-            address=address,
-            website=website,
-            phone=phone,
-            reviews_average=reviews_average,
-            query=query,
-            latitude=lat_val,
-            longitude=lon_val,
-        )
+async def _read_detail_panel(
+    page: Page,
+    listing,
+    *,
+    extractor: ListingExtractor,
+    waits: WaitEngine,
+    context: Dict[str, Any],
+    event_cb: Optional[Callable],
+    expected_name: str = "",
+    previous_name: str = "",
+) -> Optional[ListingDetails]:
+    try:
+        await listing.click()
+    except Exception as exc:
+        await notify(event_cb, "warning", f"Failed to open listing: {exc}", context=context)
+        return None
+    await waits.detail_ready(
+        page,
+        expected_name=expected_name,
+        previous_name=previous_name,
+        selector=extractor.selectors.name,
+    )
 
-        batch.append(record)
-        if len(batch) >= batch_size:
-            try:
-                inserted = store.save_new(batch)
-            except Exception as exc:
-                await _notify(event_cb, "error", f"Failed to persist batch: {exc}", context=context)
-                batch.clear()
-                continue
-            batch.clear()
-            if inserted:
-                saved_count += len(inserted)
-                for item in inserted:
-                    logger.info(
-                        "%sSaving new listing: %s | %s%s",
-                        GREEN_ON_BLACK,
-                        item.get("name", ""),
-                        item.get("address", ""),
-                        RESET,
-                    )
-                await _notify(progress_cb, min(saved_count, total), total)
-                await _notify(business_cb, inserted, context)
+    try:
+        return await extractor.extract(page)
+    except Exception as exc:
+        await notify(event_cb, "warning", f"Failed to read listing: {exc}", context=context)
+        return None
 
-    if batch:
-        try:
-            inserted = store.save_new(batch)
-        except Exception as exc:
-            await _notify(event_cb, "error", f"Failed to persist final batch: {exc}", context=context)
-            inserted = []
-        if inserted:
-            saved_count += len(inserted)
-            for item in inserted:
-                logger.info(
-                    "%sSaving new listing: %s | %s%s",
-                    GREEN_ON_BLACK,
-                    item.get("name", ""),
-                    item.get("address", ""),
-                    RESET,
-                )
-            await _notify(business_cb, inserted, context)
 
-    await _notify(progress_cb, min(saved_count, total), total)
-    await _notify(heartbeat_cb)
+async def _queue_batch(
+    writer: PersistencePipeline,
+    batch: list[BusinessRecord],
+    *,
+    result: CellResult,
+    total: int,
+    context: Dict[str, Any],
+    progress_cb: Optional[Callable],
+    event_cb: Optional[Callable],
+    business_cb: Optional[Callable],
+    failure_message: str,
+) -> asyncio.Future:
+    async def on_saved(inserted: list[Dict]) -> None:
+        for item in inserted:
+            logger.info(
+                "%sSaving new listing: %s | %s%s",
+                GREEN_ON_BLACK,
+                item.get("name", ""),
+                item.get("address", ""),
+                RESET,
+            )
+        result.saved += len(inserted)
+        await notify(business_cb, inserted, context)
+        await notify(progress_cb, min(result.saved, total), total)
+
+    async def on_error(exc: Exception) -> None:
+        await notify(event_cb, "error", f"{failure_message}: {exc}", context=context)
+
+    return await writer.submit(batch, on_saved=on_saved, on_error=on_error)
 
 
 async def scrape_city_grid(
@@ -244,55 +516,141 @@ async def scrape_city_grid(
     heartbeat_cb: Optional[Callable] = None,
     event_cb: Optional[Callable] = None,
     business_cb: Optional[Callable] = None,
+    mode: str = "detail",
+    detail_fields: Sequence[str] = (),
+    record_dir: Optional[Path] = None,
+    waits: Optional[WaitEngine] = None,
+    geocode_store: Optional[GeocodeStore] = None,
+    planner: str = "uniform",
+    max_depth: int = 2,
+    max_cells: int = 100,
+    prune_after: int = 1,
+    coverage: Optional[CoverageIndex] = None,
+    coverage_mode: str = "record",
+    governor: Optional[RateGovernor] = None,
+    writer: Optional[PersistencePipeline] = None,
 ) -> None:
-    """Scrape a city's grid using an existing Playwright page and store."""
+    """Scrape a city's grid using an existing Playwright page and store.
+
+    ``planner="adaptive"`` starts from the same grid but splits cells whose
+    results were truncated and prunes cells next to empty ones; see
+    :class:`grid_planner.QuadtreePlanner`. With a ``coverage`` index every
+    cell is logged, and ``coverage_mode`` ``"skip"``/``"downweight"`` avoids
+    areas where recent scrapes of the same term found nothing new. A shared
+    ``governor`` paces cells across all workers instead of the random
+    ``min_delay``/``max_delay`` cooldown. Records are written through
+    ``writer`` (a :class:`persistence.PersistencePipeline` over ``store``)
+    so database latency does not stall the event loop.
+    """
 
     context = context or {"city": city, "query": query}
+    waits = waits or WaitEngine()
     manage_store = store is None
     if store is None:
         store = BusinessStore(dsn)
+    manage_writer = writer is None
+    if writer is None:
+        writer = PersistencePipeline(store)
 
     async def run(active_page: Page) -> None:
-        lat_center, lon_center = await _geocode_city(active_page, city)
-        coords = [
-            (i, j)
-            for i in range(-steps, steps + 1)
-            for j in range(-steps, steps + 1)
-        ]
-        random.shuffle(coords)
-        for i, j in coords:
-            lat = lat_center + i * spacing
-            lon = lon_center + j * spacing
+        lat_center, lon_center = await _geocode_city(
+            active_page, city, waits=waits, geocode_store=geocode_store
+        )
+        if planner == "adaptive":
+            grid: Any = QuadtreePlanner(
+                lat_center,
+                lon_center,
+                steps,
+                spacing,
+                max_depth=max_depth,
+                max_cells=max_cells,
+                prune_after=prune_after,
+            )
+        else:
+            grid = UniformPlanner(lat_center, lon_center, steps, spacing)
+        term = context.get("term") or query
+        while (cell := grid.next_cell()) is not None:
             cell_context = dict(context)
-            cell_context.update({"grid": {"i": i, "j": j}, "latitude": lat, "longitude": lon})
-            await scrape_at_location(
-                active_page,
-                query,
-                total,
-                lat,
-                lon,
-                store=store,
-                context=cell_context,
-                progress_cb=progress_cb,
-                heartbeat_cb=heartbeat_cb,
-                event_cb=event_cb,
-                business_cb=business_cb,
+            cell_context.update(
+                {"grid": cell.as_context(), "latitude": cell.lat, "longitude": cell.lon}
             )
-            await _notify(progress_cb, 0, total)
-            delay = random.uniform(min_delay, max_delay)
-            await _notify(event_cb, "info", f"Cooling down for {delay:.1f}s", context=cell_context)
-            await active_page.wait_for_timeout(int(delay * 1000))
-
-    if page is None:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=headless, args=list(launch_args or []))
-            active_page = await browser.new_page()
+            cell_total = total
+            if coverage is not None:
+                decision = coverage.assess(
+                    term, cell.lat, cell.lon, cell.spacing / 2, total, mode=coverage_mode
+                )
+                if decision.skip:
+                    await notify(
+                        event_cb,
+                        "info",
+                        f"Skipping cell exhausted by {decision.previous} earlier scrapes",
+                        context=cell_context,
+                    )
+                    continue
+                cell_total = decision.total
+            if governor is not None:
+                waited = await governor.acquire(heartbeat_cb)
+                if waited >= 1.0:
+                    await notify(
+                        event_cb,
+                        "info",
+                        f"Waited {waited:.1f}s for the rate governor "
+                        f"({governor.rate:.1f} cells/min)",
+                        context=cell_context,
+                    )
             try:
-                await run(active_page)
-            finally:
-                await browser.close()
-    else:
-        await run(page)
+                result = await scrape_at_location(
+                    active_page,
+                    query,
+                    cell_total,
+                    cell.lat,
+                    cell.lon,
+                    store=store,
+                    context=cell_context,
+                    progress_cb=progress_cb,
+                    heartbeat_cb=heartbeat_cb,
+                    event_cb=event_cb,
+                    business_cb=business_cb,
+                    mode=mode,
+                    detail_fields=detail_fields,
+                    record_dir=record_dir,
+                    waits=waits,
+                    zoom=cell.zoom,
+                    writer=writer,
+                )
+            except PlaywrightTimeoutError:
+                if governor is not None:
+                    governor.report_throttle("timeout")
+                raise
+            if governor is not None:
+                governor.report(result.signal)
+            if result.signal is None:
+                # Blocked or empty pages say nothing about the area itself.
+                grid.record(cell, result.found, result.saved, cell_total)
+                if coverage is not None:
+                    coverage.record(
+                        term, query, cell.lat, cell.lon, cell.zoom, result.found, result.saved
+                    )
+            await notify(progress_cb, 0, total)
+            if governor is None:
+                delay = random.uniform(min_delay, max_delay)
+                await notify(event_cb, "info", f"Cooling down for {delay:.1f}s", context=cell_context)
+                await active_page.wait_for_timeout(int(delay * 1000))
+
+    try:
+        if page is None:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=headless, args=list(launch_args or []))
+                active_page = await browser.new_page()
+                try:
+                    await run(active_page)
+                finally:
+                    await browser.close()
+        else:
+            await run(page)
+    finally:
+        if manage_writer:
+            await writer.close()
 
     if manage_store:
         store.close()
@@ -0,0 +1,186 @@
+"""One writer thread per SQLite file that group-commits batches from all workers."""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# ``updated_at`` is Unix time; incremental syncs use it as their high-water mark.
+SQLITE_UPSERT_BUSINESS = """
+    INSERT INTO businesses (
+        name, address, website, phone, reviews_average, query, latitude, longitude, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, (julianday('now') - 2440587.5) * 86400.0)
+    ON CONFLICT(name, address) DO UPDATE SET
+        website=excluded.website,
+        phone=excluded.phone,
+        reviews_average=excluded.reviews_average,
+        query=excluded.query,
+        latitude=excluded.latitude,
+        longitude=excluded.longitude,
+        updated_at=excluded.updated_at
+"""
+
+_STOP = object()
+
+
+class SqliteConnection(sqlite3.Connection):
+    """Connection used for reads; writes go to the shared :attr:`writer`."""
+
+    path: str = ""
+    writer: Optional["SqliteWriter"] = None
+
+
+class SqliteWriter:
+    """Own the only write connection to a SQLite file.
+
+    Callers hand over batches with :meth:`write` and block until they are
+    committed. The writer thread collects batches for up to ``max_delay``
+    seconds or ``max_rows`` rows and commits them in one transaction, so
+    concurrent workers no longer compete for the WAL write lock. If the
+    shared transaction fails, each batch is retried on its own so only the
+    faulty one reports an error. The WAL is checkpointed every
+    ``checkpoint_interval`` seconds and truncated on close.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_rows: int = 500,
+        max_delay: float = 0.05,
+        checkpoint_interval: float = 60.0,
+    ) -> None:
+        self.path = path
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.checkpoint_interval = checkpoint_interval
+        self.commits = 0
+        self.rows = 0
+        self.checkpoints = 0
+        self.users = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute("PRAGMA busy_timeout=30000;")
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, values_seq: list[tuple]) -> None:
+        """Queue ``values_seq`` and wait until it is committed."""
+        future: Future = Future()
+        self._queue.put((values_seq, future))
+        future.result()
+
+    def _run(self) -> None:
+        last_checkpoint = time.monotonic()
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.checkpoint_interval)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            pending = [item] if item is not None else []
+            rows = sum(len(values) for values, _ in pending)
+            deadline = time.monotonic() + self.max_delay
+            while pending and rows < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.append(item)
+                rows += len(item[0])
+            if pending:
+                self._commit(pending)
+            if time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                self._checkpoint("PASSIVE")
+                last_checkpoint = time.monotonic()
+        # Batches queued behind the stop marker are still written.
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self._commit(leftover)
+
+    def _commit(self, pending: list[tuple[list[tuple], Future]]) -> None:
+        try:
+            for values_seq, _ in pending:
+                self._conn.executemany(SQLITE_UPSERT_BUSINESS, values_seq)
+            self._conn.commit()
+        except Exception as exc:  # noqa: BLE001 - the writer thread must keep running
+            self._conn.rollback()
+            if len(pending) == 1:
+                pending[0][1].set_exception(exc)
+                return
+            for entry in pending:
+                self._commit([entry])
+            return
+        self.commits += 1
+        for values_seq, future in pending:
+            self.rows += len(values_seq)
+            future.set_result(None)
+
+    def _checkpoint(self, mode: str) -> None:
+        try:
+            self._conn.execute(f"PRAGMA wal_checkpoint({mode})")
+            self.checkpoints += 1
+        except sqlite3.Error as exc:
+            logger.warning("WAL checkpoint of %s failed: %s", self.path, exc)
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._checkpoint("TRUNCATE")
+        self._conn.close()
+
+
+_writers: dict[str, SqliteWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def sqlite_writer(path: str) -> SqliteWriter:
+    """Return the process-wide writer for ``path``, starting it on first use."""
+    resolved = str(Path(path).resolve())
+    with _writers_lock:
+        writer = _writers.get(resolved)
+        if writer is None:
+            writer = _writers[resolved] = SqliteWriter(
+                path,
+                max_rows=int(os.environ.get("SQLITE_COMMIT_ROWS", "500")),
+                max_delay=float(os.environ.get("SQLITE_COMMIT_DELAY_MS", "50")) / 1000,
+                checkpoint_interval=float(os.environ.get("SQLITE_CHECKPOINT_SECONDS", "60")),
+            )
+        writer.users += 1
+        return writer
+
+
+def release_sqlite_writer(writer: SqliteWriter) -> None:
+    with _writers_lock:
+        writer.users -= 1
+        if writer.users > 0:
+            return
+        resolved = str(Path(writer.path).resolve())
+        if _writers.get(resolved) is writer:
+            del _writers[resolved]
+    writer.close()
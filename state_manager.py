@@ -174,6 +174,21 @@ class StateManager:
             self._dirty = True
             await self._maybe_flush_locked()
 
+    async def set_metric(self, name: str, value: Any) -> None:
+        """Replace a run-wide entry under ``metrics`` in the state file."""
+        async with self._lock:
+            self.state.setdefault("metrics", {})[name] = value
+            self._dirty = True
+            await self._maybe_flush_locked()
+
+    async def record_wait_stats(self, worker_id: int, stats: Dict[str, Any]) -> None:
+        """Store the latest wait timings reported by a worker."""
+        async with self._lock:
+            metrics = self.state.setdefault("metrics", {})
+            metrics.setdefault("waits", {})[str(worker_id)] = stats
+            self._dirty = True
+            await self._maybe_flush_locked()
+
     async def record_business_batch(
         self,
         worker_id: int,
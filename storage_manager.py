@@ -1,14 +1,23 @@
+import logging
 from dataclasses import dataclass, asdict
 from typing import Dict, Iterable, List, Optional
 
 from db import (
+    BatchWriteError,
+    business_snapshot_path,
+    business_store_fingerprint,
+    business_store_scope,
     close_db,
     get_dsn,
     get_storage,
     init_db,
-    load_business_keys,
-    save_business_batch,
+    insert_new_businesses,
+    load_business_key_tail,
 )
+from dedupe_index import DedupeIndex, business_key
+from place_index import PlaceIndex
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -21,6 +30,9 @@ class BusinessRecord:
     query: str
     latitude: Optional[float]
     longitude: Optional[float]
+    # Kept in the place index (not the businesses table) so known places
+    # can be skipped without opening them.
+    place_id: Optional[str] = None
 
     def as_tuple(self) -> tuple:
         return (
@@ -42,56 +54,113 @@ class BusinessRecord:
 class BusinessStore:
     """Maintain a connection and dedupe cache for business inserts."""
 
-    def __init__(self, dsn: Optional[str], *, storage: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        dsn: Optional[str],
+        *,
+        storage: Optional[str] = None,
+        place_index: Optional[PlaceIndex] = None,
+        dedupe: Optional[DedupeIndex] = None,
+    ) -> None:
         self.storage = get_storage(storage)
-        resolved_dsn = get_dsn(dsn)
+        self.place_index = place_index
+        # Records dropped because they had no name or address.
+        self.incomplete = 0
+        resolved_dsn = get_dsn(dsn, storage=self.storage)
         self.conn = init_db(resolved_dsn, storage=self.storage)
-        # Preload dedupe keys only for storage engines where it is cheap.
-        self._preload_complete = self.storage in {"sqlite", "csv"}
-        self._seen_keys = (
-            load_business_keys(self.conn, storage=self.storage)
-            if self._preload_complete
-            else set()
+        # Stores sharing a dedupe index load the stored keys only once.
+        self._owns_dedupe = dedupe is None
+        self.dedupe = dedupe if dedupe is not None else DedupeIndex.for_storage(self.storage)
+        self.dedupe.preload(
+            lambda since: load_business_key_tail(self.conn, since, storage=self.storage),
+            snapshot=business_snapshot_path(self.conn, storage=self.storage),
+            identity=business_store_fingerprint(self.conn, storage=self.storage),
         )
+        if self.place_index is not None:
+            self.place_index.load(
+                business_store_scope(resolved_dsn, storage=self.storage),
+                business_store_fingerprint(self.conn, storage=self.storage),
+            )
+
+    def knows_place(self, place_id: Optional[str]) -> bool:
+        """Return True when ``place_id`` belongs to an already stored business."""
+        return self.place_index is not None and place_id in self.place_index
 
     def filter_new(self, records: Iterable[BusinessRecord]) -> List[BusinessRecord]:
         fresh: List[BusinessRecord] = []
+        known: List[BusinessRecord] = []
         for record in records:
-            key = (record.name.strip().lower(), record.address.strip().lower())
             if not record.name.strip() or not record.address.strip():
+                # Name and address form the dedupe key; without both the
+                # record cannot be stored.
+                self.incomplete += 1
+                logger.warning("Dropped listing without a name or address: %r", record.name)
                 continue
-            if key in self._seen_keys:
+            if self.knows_place(record.place_id):
                 continue
-            if not self._preload_complete and self._exists_in_store(record):
-                self._seen_keys.add(key)
+            # Reserving the key stops another worker from saving the same
+            # business while this batch is being written.
+            key = business_key(record.name, record.address)
+            if not self.dedupe.reserve(key):
+                # A key another worker has only reserved may still fail to
+                # be written, so only stored businesses are indexed.
+                if self.dedupe.is_stored(key):
+                    known.append(record)
                 continue
-            self._seen_keys.add(key)
             fresh.append(record)
+        # Businesses stored before place IDs were tracked get their ID indexed
+        # the first time they are seen again.
+        self._index_places(known)
         return fresh
 
     def save_new(self, records: Iterable[BusinessRecord]) -> List[Dict]:
+        """Store the records that are not stored yet and return them as dicts.
+
+        When the dedupe index does not hold every stored key (Postgres,
+        Cassandra) the store itself decides which rows are new, in the same
+        round-trip as the insert.
+        """
         fresh_records = self.filter_new(records)
         if not fresh_records:
             return []
         tuples = [r.as_tuple() for r in fresh_records]
-        save_business_batch(self.conn, tuples, storage=self.storage)
-        return [r.as_dict() for r in fresh_records]
+        try:
+            inserted = insert_new_businesses(self.conn, tuples, storage=self.storage)
+        except BatchWriteError as exc:
+            # Only the failed rows may be retried; the rest are stored.
+            failed = {values for values, _ in exc.failures}
+            written = set(exc.written)
+            self.dedupe.release(
+                business_key(r.name, r.address) for r in fresh_records if r.as_tuple() in failed
+            )
+            stored = [r for r in fresh_records if r.as_tuple() not in failed]
+            self.dedupe.confirm(business_key(r.name, r.address) for r in stored)
+            self._index_places(stored)
+            exc.saved = [r.as_dict() for r in fresh_records if r.as_tuple() in written]
+            raise
+        except Exception:
+            self.dedupe.release(business_key(r.name, r.address) for r in fresh_records)
+            raise
+        # Rows the store already had are confirmed hits, so they are indexed
+        # along with the inserted ones.
+        self.dedupe.confirm(business_key(r.name, r.address) for r in fresh_records)
+        self._index_places(fresh_records)
+        new_rows = set(inserted)
+        return [r.as_dict() for r in fresh_records if r.as_tuple() in new_rows]
 
-    def close(self) -> None:
-        close_db(self.conn, storage=self.storage)
+    def _index_places(self, records: List[BusinessRecord]) -> None:
+        if self.place_index is None:
+            return
+        self.place_index.add_many(
+            (r.place_id, r.name, r.address) for r in records if r.place_id
+        )
 
-    def _exists_in_store(self, record: BusinessRecord) -> bool:
-        if self.storage == "postgres":
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    "SELECT 1 FROM businesses WHERE name = %s AND address = %s LIMIT 1",
-                    (record.name, record.address),
-                )
-                return cur.fetchone() is not None
-        if self.storage == "cassandra":
-            rows = self.conn.execute(
-                "SELECT name FROM businesses WHERE name = %s AND address = %s LIMIT 1",
-                (record.name, record.address),
+    def close(self) -> None:
+        if self.place_index is not None:
+            # A store that started empty gets its fingerprint once it has rows.
+            self.place_index.note_fingerprint(
+                business_store_fingerprint(self.conn, storage=self.storage)
             )
-            return any(rows)
-        return False
+        if self._owns_dedupe:
+            self.dedupe.close()
+        close_db(self.conn, storage=self.storage)
@@ -0,0 +1,154 @@
+"""Copy new and changed businesses from one backend to another, incrementally."""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from db import close_db, get_dsn, init_db, iter_business_changes, save_business_batch
+from parquet_store import ParquetStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE = "sync_state.json"
+STORAGES = ["postgres", "cassandra", "sqlite", "csv", "parquet"]
+
+
+class SyncState:
+    """High-water marks per source/target pair, kept in a JSON file.
+
+    Pairs are keyed by backend names and a hash of both DSNs, so passwords
+    in a Postgres DSN never end up in the file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            self.state: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.state = {}
+
+    @staticmethod
+    def pair_key(source: str, source_dsn: str, target: str, target_dsn: str) -> str:
+        digest = hashlib.blake2b(f"{source_dsn}\0{target_dsn}".encode(), digest_size=6).hexdigest()
+        return f"{source}->{target}:{digest}"
+
+    def mark(self, key: str) -> Any:
+        return self.state.get(key, {}).get("mark", 0)
+
+    def save(self, key: str, mark: Any, rows: int) -> None:
+        entry = self.state.setdefault(key, {"mark": 0, "rows": 0})
+        entry["mark"] = mark
+        entry["rows"] += rows
+        entry["synced_at"] = time.time()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def open_sync_source(dsn: str, storage: str):
+    # A Parquet source is read through a read-only manifest connection; the
+    # other backends are opened normally so sqlite gains its updated_at column.
+    if storage == "parquet":
+        return ParquetStore(dsn, readonly=True)
+    return init_db(dsn, storage=storage)
+
+
+def close_sync_source(conn, storage: str) -> None:
+    if isinstance(conn, ParquetStore):
+        conn.close()
+    else:
+        close_db(conn, storage=storage)
+
+
+def sync_businesses(
+    source_conn,
+    target_conn,
+    *,
+    source: str,
+    target: str,
+    state: SyncState,
+    key: str,
+    chunk_size: int = 5000,
+    overlap: float = 60.0,
+) -> int:
+    """Copy rows changed since the stored mark and advance it chunk by chunk."""
+    since = state.mark(key)
+    copied = 0
+    started = time.monotonic()
+    logger.info("Syncing %s -> %s from mark %s", source, target, since)
+    for rows, mark in iter_business_changes(
+        source_conn, since, storage=source, chunk_size=chunk_size, overlap=overlap
+    ):
+        if rows:
+            save_business_batch(target_conn, rows, storage=target)
+            copied += len(rows)
+        if rows or mark != since:
+            state.save(key, mark, len(rows))
+            since = mark
+        if rows:
+            logger.info(
+                "%d rows copied (%.0f rows/s)",
+                copied,
+                copied / max(time.monotonic() - started, 1e-9),
+            )
+    logger.info("Sync finished: %d rows copied, mark now %s", copied, since)
+    return copied
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Copy new and changed businesses between storage backends")
+    parser.add_argument("--from", dest="source", choices=STORAGES, required=True, help="Source backend")
+    parser.add_argument("--from-dsn", help="Source DSN or path (defaults as for the scraper)")
+    parser.add_argument("--to", dest="target", choices=STORAGES, required=True, help="Target backend")
+    parser.add_argument("--to-dsn", help="Target DSN or path (defaults as for the scraper)")
+    parser.add_argument("--state", type=Path, default=Path(DEFAULT_STATE), help="High-water mark file")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows read and written per chunk")
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=60.0,
+        help="Seconds re-read before a timestamp mark to catch late commits",
+    )
+    parser.add_argument("--full", action="store_true", help="Ignore the stored mark and copy everything")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    source_dsn = args.from_dsn or get_dsn(storage=args.source)
+    target_dsn = args.to_dsn or get_dsn(storage=args.target)
+    if (args.source, source_dsn) == (args.target, target_dsn):
+        raise SystemExit("Source and target are the same store")
+    state = SyncState(args.state)
+    key = SyncState.pair_key(args.source, source_dsn, args.target, target_dsn)
+    if args.full:
+        state.save(key, 0, 0)
+    source_conn = open_sync_source(source_dsn, args.source)
+    try:
+        target_conn = init_db(target_dsn, storage=args.target)
+        try:
+            sync_businesses(
+                source_conn,
+                target_conn,
+                source=args.source,
+                target=args.target,
+                state=state,
+                key=key,
+                chunk_size=args.chunk_size,
+                overlap=args.overlap,
+            )
+        finally:
+            close_db(target_conn, storage=args.target)
+    finally:
+        close_sync_source(source_conn, args.source)
+
+
+if __name__ == "__main__":
+    main()
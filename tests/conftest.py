@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The modules live at the repository root rather than in a package.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
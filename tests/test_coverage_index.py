@@ -0,0 +1,26 @@
+from coverage_index import CoverageIndex
+
+
+def test_broader_term_covers_narrower_one(tmp_path):
+    index = CoverageIndex(str(tmp_path / "cache.db"))
+    index.record("Pizza", "\"Abbeville AL\" pizza", 31.57, -85.25, 14, 20, 0)
+
+    narrower = index.assess("pizza  delivery", 31.57, -85.25, 0.01, 20, mode="skip")
+    broader = index.assess("food", 31.57, -85.25, 0.01, 20, mode="skip")
+    index.record("pizza delivery", "", 31.57, -85.25, 14, 20, 0)
+    reverse = index.assess("pizza", 31.57, -85.25, 0.01, 20, mode="skip")
+    index.close()
+
+    assert narrower.skip and narrower.previous == 1
+    assert not broader.skip
+    # "pizza delivery" does not cover "pizza"; only pizza's own row counts.
+    assert reverse.skip and reverse.previous == 1
+
+
+def test_new_business_from_covering_term_keeps_cell(tmp_path):
+    index = CoverageIndex(str(tmp_path / "cache.db"))
+    index.record("pizza", "", 31.57, -85.25, 14, 20, 3)
+    decision = index.assess("pizza delivery", 31.57, -85.25, 0.01, 20, mode="downweight")
+    index.close()
+
+    assert decision.action == "scrape"
@@ -0,0 +1,28 @@
+from csv_store import CsvStore
+
+
+def test_append_dedupes_through_keys_snapshot(tmp_path):
+    path = tmp_path / "businesses.csv"
+    store = CsvStore(path)
+    assert store.append([("A", "1 Main St"), ("B", "2 Main St"), ("a ", "1 main st")]) == 2
+    store.close()
+    assert store.keys_path.exists()
+
+    reopened = CsvStore(path)
+    assert reopened.append([("A", "1 Main St"), ("C", "3 Main St")]) == 1
+    assert reopened.count() == 3
+    reopened.close()
+
+
+def test_read_keys_stops_before_partial_row(tmp_path):
+    path = tmp_path / "businesses.csv"
+    store = CsvStore(path)
+    store.append([("A", "1 Main St")])
+    store.close()
+    complete = path.stat().st_size
+    with open(path, "a") as f:
+        f.write('"B,partial')
+
+    keys, end = CsvStore(path).read_keys(0)
+    assert list(keys) == [("a", "1 main st")]
+    assert end == complete
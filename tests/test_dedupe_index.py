@@ -0,0 +1,51 @@
+from dedupe_index import DedupeIndex, business_key
+
+
+def test_full_load_streams_keys_and_snapshot_resumes(tmp_path):
+    snapshot = str(tmp_path / "maps.db.keys")
+    consumed = []
+
+    def stored_keys(count):
+        for i in range(count):
+            consumed.append(i)
+            yield business_key(f"Biz {i}", f"{i} Main St")
+
+    index = DedupeIndex()
+    index.preload(lambda since: (stored_keys(5), 5), snapshot=snapshot, identity="ab")
+    assert len(consumed) == 5
+    assert business_key("biz 3", "3 main st") in index
+    assert not index.reserve(business_key("Biz 4", "4 Main St"))
+    index.close()
+
+    resumed = DedupeIndex()
+    calls = []
+
+    def tail(since):
+        calls.append(since)
+        return [business_key("Biz 5", "5 Main St")], 6
+
+    resumed.preload(tail, snapshot=snapshot, identity="ab")
+    assert calls == [5]
+    assert business_key("Biz 0", "0 Main St") in resumed
+    assert business_key("Biz 5", "5 Main St") in resumed
+    resumed.close()
+
+
+def test_snapshot_of_another_store_is_rebuilt(tmp_path):
+    snapshot = str(tmp_path / "maps.db.keys")
+    first = DedupeIndex()
+    first.preload(lambda since: ([business_key("Old", "1 St")], 1), snapshot=snapshot, identity="01")
+    first.close()
+
+    calls = []
+
+    def loader(since):
+        calls.append(since)
+        return iter([business_key("New", "2 St")]), 3
+
+    second = DedupeIndex()
+    second.preload(loader, snapshot=snapshot, identity="02")
+    assert calls == [0]
+    assert business_key("Old", "1 St") not in second
+    assert business_key("New", "2 St") in second
+    second.close()
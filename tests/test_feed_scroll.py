@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from feed_scroll import FeedScroller  # noqa: E402
+
+
+class SlicingPage:
+    """Reports two unfinished slices, then the end of the list."""
+
+    def __init__(self) -> None:
+        self.slices = 0
+
+    async def evaluate(self, script, arg=None):
+        self.slices += 1
+        if self.slices < 3:
+            return {"count": self.slices * 10, "reason": "slice", "idle": 0}
+        return {"count": 25, "reason": "end_of_list", "idle": 0}
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_heartbeat_may_be_sync_or_async(is_async):
+    beats = []
+
+    def sync_beat():
+        beats.append(1)
+
+    async def async_beat():
+        beats.append(1)
+
+    outcome = asyncio.run(
+        FeedScroller().scroll(SlicingPage(), 40, heartbeat=async_beat if is_async else sync_beat)
+    )
+
+    assert outcome.reason == "end_of_list" and outcome.count == 25
+    assert len(beats) == 2
@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from network_capture import compare_expected, expected_path, parse_search_payload
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+BODIES = sorted(FIXTURES.glob("maps_search_response.*.txt"))
+
+
+@pytest.mark.parametrize("body", BODIES, ids=lambda path: path.name)
+def test_payload_matches_expected_listings(body):
+    sidecar = expected_path(body)
+    assert sidecar.exists(), f"{sidecar.name} is missing; write it with --write-expected"
+    expected = json.loads(sidecar.read_text(encoding="utf-8"))
+    records = parse_search_payload(body.read_text(encoding="utf-8"), "q")
+    assert expected, "a fixture must pin at least one listing"
+    assert compare_expected(records, expected) == []
+
+
+def test_a_recorded_response_is_checked_in():
+    recorded = [body for body in BODIES if ".synthetic." not in body.name]
+    if not recorded:
+        pytest.skip("no recorded Maps response in fixtures/ yet; see network_capture's docstring")
+    assert all(expected_path(body).exists() for body in recorded)
+
+
+def test_compare_expected_reports_a_wrong_place_id():
+    body = FIXTURES / "maps_search_response.synthetic.txt"
+    records = parse_search_payload(body.read_text(encoding="utf-8"), "q")
+    expected = json.loads(expected_path(body).read_text(encoding="utf-8"))
+    expected[0]["place_id"] = "0x0:0x0"
+    problems = compare_expected(records, expected)
+    assert len(problems) == 1 and problems[0].startswith("listing 0:")
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from rate_governor import RateGovernor
+
+
+def test_every_queued_worker_gets_heartbeats():
+    # Ten workers share one token every 0.1 s, so the last waits about 1 s.
+    governor = RateGovernor(rate=600.0, min_rate=600.0, max_rate=600.0)
+    poll = 0.05
+    gaps: list[float] = []
+    order: list[int] = []
+
+    async def worker(worker_id: int) -> None:
+        last = time.monotonic()
+
+        async def heartbeat() -> None:
+            nonlocal last
+            now = time.monotonic()
+            gaps.append(now - last)
+            last = now
+
+        await governor.acquire(heartbeat, poll=poll)
+        gaps.append(time.monotonic() - last)
+        order.append(worker_id)
+
+    async def main() -> float:
+        started = time.monotonic()
+        await asyncio.gather(*(worker(i) for i in range(10)))
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(main())
+
+    assert order == list(range(10))
+    assert 0.8 <= elapsed < 1.5
+    assert max(gaps) < poll + 0.03
+
+
+def test_backoff_slows_workers_already_queued():
+    governor = RateGovernor(rate=600.0, min_rate=60.0)
+
+    async def main() -> float:
+        started = time.monotonic()
+        first = asyncio.gather(*(governor.acquire(poll=0.01) for _ in range(3)))
+        await asyncio.sleep(0)
+        governor.report_throttle("captcha")
+        await first
+        return time.monotonic() - started
+
+    # After the back-off the two queued workers get a token every 0.2 s.
+    assert asyncio.run(main()) >= 0.35
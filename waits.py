@@ -0,0 +1,171 @@
+"""Condition-based waits that return as soon as the page is ready."""
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from playwright.async_api import Page
+
+# Upper bounds per step in milliseconds. A wait normally ends well before its
+# timeout; hitting one is recorded so slow steps show up in the metrics.
+DEFAULT_TIMEOUTS: Dict[str, int] = {
+    "search": 10000,
+    "detail": 5000,
+    # How long the feed may stop growing before the scroller gives up.
+    "feed": 3000,
+    "geocode": 15000,
+}
+
+_RESULTS_READY = """
+(selectors) => Boolean(
+    document.querySelector(selectors.anchor)
+    || document.querySelector(selectors.detail)
+    || document.querySelector(selectors.feed)
+    || document.querySelector(selectors.empty)
+)
+"""
+
+# Maps answers a search with nothing in the area with a message in the side
+# panel instead of a feed.
+_NO_RESULTS = """
+([selector, phrases]) => {
+    if (document.querySelector(selector)) return true;
+    const pane = document.querySelector("div[role='main']") || document.body;
+    const text = (pane && pane.innerText) || "";
+    return phrases.some((phrase) => text.includes(phrase));
+}
+"""
+
+_DETAIL_READY = """
+([selector, expected, previous]) => {
+    const el = document.querySelector(selector);
+    const text = el ? (el.innerText || "").trim() : "";
+    if (!text) return false;
+    return expected ? text === expected : text !== previous;
+}
+"""
+
+# The bare /maps URL also carries @lat,lon for the default viewport, so only
+# a place or search URL counts as the answer to a geocode search.
+_URL_HAS_COORDS = """
+() => /\\/maps\\/(place|search)\\/.*@-?\\d+\\.\\d+,-?\\d+\\.\\d+/.test(window.location.href)
+"""
+
+
+@dataclass
+class WaitStat:
+    """Running totals for one kind of wait."""
+
+    count: int = 0
+    timeouts: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, elapsed_ms: float, timed_out: bool) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if timed_out:
+            self.timeouts += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_ms"] = self.total_ms / self.count if self.count else 0.0
+        return data
+
+
+class WaitEngine:
+    """Wait for readiness conditions instead of sleeping for fixed periods.
+
+    Every wait has a per-step timeout and records how long it actually took,
+    so :meth:`snapshot` shows where a worker spends its time.
+    """
+
+    anchor_selector = "a[href^='https://www.google.com/maps/place']"
+    detail_selector = "h1.DUwDvf"
+    feed_selector = "div[role='feed']"
+    no_results_selector = "div.Q2vNVc"
+    no_results_phrases = ("Google Maps can't find", "No results found")
+
+    def __init__(self, timeouts: Optional[Mapping[str, int]] = None) -> None:
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.stats: Dict[str, WaitStat] = {}
+
+    async def until(
+        self,
+        step: str,
+        page: Page,
+        expression: str,
+        arg: Any = None,
+        *,
+        timeout: Optional[int] = None,
+    ) -> bool:
+        """Wait for ``expression`` to become truthy; return False on timeout."""
+        limit = timeout if timeout is not None else self.timeouts.get(step, 5000)
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            await page.wait_for_function(expression, arg=arg, timeout=limit)
+        except Exception:  # noqa: BLE001 - timeouts and navigation races alike
+            timed_out = True
+        self.record(step, (time.perf_counter() - started) * 1000, timed_out)
+        return not timed_out
+
+    def record(self, step: str, elapsed_ms: float, timed_out: bool = False) -> None:
+        """Add a timing measured elsewhere, e.g. by the feed scroller."""
+        self.stats.setdefault(step, WaitStat()).add(elapsed_ms, timed_out)
+
+    async def results_ready(self, page: Page) -> bool:
+        """Wait for the result feed, a result link, a single place panel or
+        Maps' "no results" message."""
+        selectors = {
+            "anchor": self.anchor_selector,
+            "detail": self.detail_selector,
+            "feed": self.feed_selector,
+            "empty": self.no_results_selector,
+        }
+        return await self.until("search", page, _RESULTS_READY, selectors)
+
+    async def shows_no_results(self, page: Page) -> bool:
+        """Return True when the page says the search matched nothing."""
+        try:
+            return bool(
+                await page.evaluate(_NO_RESULTS, [self.no_results_selector, list(self.no_results_phrases)])
+            )
+        except Exception:  # noqa: BLE001 - a page that cannot be read shows nothing
+            return False
+
+    async def detail_ready(
+        self,
+        page: Page,
+        *,
+        expected_name: str = "",
+        previous_name: str = "",
+        selector: Optional[str] = None,
+    ) -> bool:
+        """Wait for the detail panel title to show the clicked listing."""
+        arg = [selector or self.detail_selector, expected_name.strip(), previous_name.strip()]
+        return await self.until("detail", page, _DETAIL_READY, arg)
+
+    async def url_has_coordinates(self, page: Page) -> bool:
+        """Wait for the map URL to carry ``@lat,lon`` after a geocode search."""
+        return await self.until("geocode", page, _URL_HAS_COORDS)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {step: stat.as_dict() for step, stat in self.stats.items()}
+
+
+def parse_timeouts(value: str) -> Dict[str, int]:
+    """Parse ``"search=8000,detail=3000"`` into a timeout mapping."""
+    timeouts: Dict[str, int] = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        step, _, millis = part.partition("=")
+        step = step.strip()
+        if step not in DEFAULT_TIMEOUTS or not millis.strip().isdigit():
+            raise ValueError(f"invalid wait timeout: {part.strip()!r}")
+        timeouts[step] = int(millis)
+    return timeouts